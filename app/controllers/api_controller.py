@@ -0,0 +1,405 @@
+from flask import Blueprint, request, jsonify, current_app, url_for
+from flask_login import current_user
+from functools import partial, wraps
+import numpy as np
+
+from utils.decorators import api_login_required
+from utils.numerical_methods import (
+    gradiente_conjugado, sor, gradiente_conjugado_bloque, sor_bloque, gradiente_conjugado_auto, sor_barrido_omega,
+    diagnosticar_sistema, verificar_cg, verificar_sor, SistemaNoAplicable, MAX_PASOS_BARRIDO,
+    newton_raphson, biseccion, secante, brent,
+    newton_raphson_multiple, secante_multiple,
+    interpolacion_lagrange, interpolacion_newton, interpolacion_spline_cubico
+)
+from utils.matrices import matriz_desde_json, matriz_a_json, es_dispersa
+from utils import trabajos
+from models.problem_model import Problem
+from controllers.method_controller import UMBRAL_ELEMENTOS_SEGUNDO_PLANO
+
+# API JSON para clientes programáticos: mismos solvers que method_bp, sin
+# formularios ni plantillas. Autenticación por sesión o HTTP Basic.
+api_bp = Blueprint("api", __name__, url_prefix="/api/v1")
+
+# Claves del resultado con el historial de iteraciones
+CLAVES_HISTORIAL = ('historial', 'historial_x', 'historial_indices', 'politica_historial',
+                    'residuos', 'errores')
+
+
+class ErrorAPI(ValueError):
+    """Error en el cuerpo de la petición (respuesta 400)"""
+
+
+def _cuerpo():
+    datos = request.get_json(silent=True)
+    if not isinstance(datos, dict):
+        raise ErrorAPI("El cuerpo debe ser un objeto JSON")
+    return datos
+
+
+def _numero(datos, clave, tipo=float, defecto=None):
+    """Lee un número del cuerpo; sin defecto la clave es obligatoria"""
+    if clave not in datos or datos[clave] is None:
+        if defecto is None:
+            raise ErrorAPI(f"Falta el campo '{clave}'")
+        return defecto
+    valor = datos[clave]
+    if isinstance(valor, bool) or not isinstance(valor, (int, float)):
+        raise ErrorAPI(f"El campo '{clave}' debe ser numérico")
+    return tipo(valor)
+
+
+def _opciones(datos):
+    """Opciones comunes: (guardar en el historial, incluir historial de iteraciones)"""
+    return bool(datos.get("guardar", True)), bool(datos.get("incluir_historial", True))
+
+
+def _sistema(datos):
+    """Matriz A y vector b (o matriz n x m de lados derechos) del cuerpo, validados"""
+    if "matriz" not in datos or "vector" not in datos:
+        raise ErrorAPI("Faltan los campos 'matriz' y/o 'vector'")
+    A = matriz_desde_json(datos["matriz"])
+    b = np.asarray(datos["vector"], dtype=float)
+    if A.ndim != 2 or A.shape[0] != A.shape[1]:
+        raise ErrorAPI("La matriz debe ser cuadrada")
+    if b.ndim not in (1, 2) or len(b) != A.shape[0]:
+        raise ErrorAPI("Las dimensiones de la matriz y el vector no coinciden")
+    return A, b
+
+
+def _punto_inicial(datos, matriz_json, b):
+    """
+    (x0, problema del que se tomó) según el campo 'inicio': "cero" (por
+    defecto), "auto" (última resolución del usuario con la misma matriz A)
+    o el id de un problema del historial.
+    """
+    inicio = datos.get("inicio", "cero")
+    if inicio in ("cero", None):
+        return None, None
+    if inicio == "auto":
+        return Problem.get_inicio_automatico(current_user.id, matriz_json, b)
+    if isinstance(inicio, bool) or not isinstance(inicio, int):
+        raise ErrorAPI("El campo 'inicio' debe ser \"cero\", \"auto\" o el id de un problema")
+    problem = Problem.get_by_id(inicio)
+    if not problem or (not current_user.has_role("admin") and problem.user_id != current_user.id):
+        raise ErrorAPI(f"El problema {inicio} indicado en 'inicio' no existe")
+    x0 = problem.get_solucion_inicial(b)
+    if x0 is None:
+        raise ErrorAPI(f"La solución del problema {inicio} no es compatible con este sistema")
+    return x0, problem
+
+
+def _sin_historial(resultado):
+    """Copia del resultado sin las claves de historial (también por columna)"""
+    resultado = {clave: valor for clave, valor in resultado.items() if clave not in CLAVES_HISTORIAL}
+    if 'columnas' in resultado:
+        resultado['columnas'] = [_sin_historial(columna) for columna in resultado['columnas']]
+    return resultado
+
+
+def _responder(method_type, input_data, resolver, guardar, incluir_historial, title):
+    """
+    Resuelve (o reutiliza el resultado de un problema idéntico), guarda en el
+    historial si se pidió y arma la respuesta JSON.
+
+    La resolución tiene un presupuesto de TIEMPO_MAX_SINCRONO segundos; si se
+    agota, el resultado es la mejor aproximación con motivo 'timeout'.
+    """
+    origen = Problem.get_resuelto(method_type, input_data)
+    if origen is not None:
+        resultado = origen.get_result_data()
+    else:
+        resultado = trabajos.limitar_tiempo(resolver, trabajos.TIEMPO_MAX_SINCRONO)()
+
+    problem_id = None
+    if guardar:
+        problem = Problem(
+            user_id=current_user.id,
+            method_type=method_type,
+            input_data=input_data,
+            result_data=resultado,
+            title=title,
+            origen=origen
+        )
+        problem.save()
+        problem_id = problem.id
+
+    if not incluir_historial:
+        resultado = _sin_historial(resultado)
+
+    respuesta = {
+        "resultado": resultado,
+        "problem_id": problem_id,
+        "reutilizado": origen is not None
+    }
+    if "x0_problema" in input_data:
+        # Problema cuya solución se usó como punto inicial
+        respuesta["x0_problema"] = input_data["x0_problema"]
+    return jsonify(respuesta)
+
+
+def _encolar(method_type, input_data, resolver, guardar, incluir_historial, title):
+    """
+    Como _responder, pero la resolución va a la cola de trabajos: responde 202
+    con el trabajo y la URL de su estado. El problema se guarda siempre en el
+    historial al terminar el trabajo.
+    """
+    if Problem.get_resuelto(method_type, input_data) is not None:
+        # Ya resuelto: se reutiliza sin pasar por la cola
+        return _responder(method_type, input_data, resolver, guardar, incluir_historial, title)
+    try:
+        job = trabajos.enviar(current_app._get_current_object(), current_user.id,
+                              method_type, input_data, title, resolver)
+    except RuntimeError as e:
+        # Cola llena
+        return jsonify({"error": str(e)}), 503
+    return jsonify({
+        "trabajo": job.to_dict(),
+        "estado": url_for("method.estado_trabajo", id=job.id)
+    }), 202
+
+
+def _manejar_errores(f):
+    """Convierte los errores de validación y de los solvers en respuestas JSON"""
+    @wraps(f)
+    def envoltura(*args, **kwargs):
+        try:
+            return f(*args, **kwargs)
+        except SistemaNoAplicable as e:
+            # El método no sirve para esta matriz: se devuelve también el diagnóstico
+            return jsonify({"error": str(e), "diagnostico": e.diagnostico}), 400
+        except (ValueError, TypeError, KeyError) as e:
+            # Incluye ErrorAPI y los ValueError de los solvers (datos inválidos)
+            return jsonify({"error": str(e)}), 400
+        except Exception as e:
+            return jsonify({"error": f"Error al resolver: {str(e)}"}), 500
+    return envoltura
+
+
+# ============================================================================
+# SISTEMAS LINEALES
+# ============================================================================
+
+@api_bp.route("/gradiente-conjugado", methods=["POST"])
+@api_login_required
+@_manejar_errores
+def gradiente_conjugado_api():
+    datos = _cuerpo()
+    guardar, incluir_historial = _opciones(datos)
+    A, b = _sistema(datos)
+    tol = _numero(datos, "tolerancia", defecto=1e-6)
+    max_iter = _numero(datos, "max_iter", int, defecto=1000)
+    precondicionador = datos.get("precondicionador") or None
+    historial = datos.get("historial", "completo") if incluir_historial else "ninguno"
+    historial_k = _numero(datos, "historial_k", int, defecto=10)
+    modo = datos.get("modo", "iterativo")
+    if modo not in ("iterativo", "auto"):
+        raise ErrorAPI(f"Modo desconocido: {modo} (use 'iterativo' o 'auto')")
+
+    matriz_json = matriz_a_json(A)
+    input_data = {
+        "matriz": matriz_json,
+        "vector": b.tolist(),
+        "tolerancia": tol,
+        "max_iter": max_iter,
+        "precondicionador": precondicionador,
+        "historial": historial,
+        "historial_k": historial_k,
+        "modo": modo
+    }
+    x0, problema_inicial = _punto_inicial(datos, matriz_json, b)
+    if problema_inicial is not None:
+        input_data["x0_problema"] = problema_inicial.id
+    if modo == "auto":
+        resolver = partial(gradiente_conjugado_auto, A, b, x0=x0, tol=tol, max_iter=max_iter,
+                           precondicionador=precondicionador,
+                           historial=historial, historial_k=historial_k)
+    else:
+        diagnostico = diagnosticar_sistema(A)
+        verificar_cg(diagnostico)
+        if b.ndim == 2:
+            resolver = partial(gradiente_conjugado_bloque, A, b, X0=x0, tol=tol, max_iter=max_iter,
+                               precondicionador=precondicionador, diagnostico=diagnostico)
+        else:
+            resolver = partial(gradiente_conjugado, A, b, x0=x0, tol=tol, max_iter=max_iter,
+                               precondicionador=precondicionador, diagnostico=diagnostico,
+                               historial=historial, historial_k=historial_k)
+    return _responder("CG", input_data, resolver, guardar, incluir_historial,
+                      datos.get("title", "Gradiente Conjugado"))
+
+
+@api_bp.route("/sor", methods=["POST"])
+@api_login_required
+@_manejar_errores
+def sor_api():
+    datos = _cuerpo()
+    guardar, incluir_historial = _opciones(datos)
+    A, b = _sistema(datos)
+    omega = "auto" if datos.get("omega") == "auto" else _numero(datos, "omega", defecto=1.5)
+    tol = _numero(datos, "tolerancia", defecto=1e-6)
+    max_iter = _numero(datos, "max_iter", int, defecto=1000)
+    historial = datos.get("historial", "completo") if incluir_historial else "ninguno"
+    historial_k = _numero(datos, "historial_k", int, defecto=10)
+
+    matriz_json = matriz_a_json(A)
+    input_data = {
+        "matriz": matriz_json,
+        "vector": b.tolist(),
+        "omega": omega,
+        "tolerancia": tol,
+        "max_iter": max_iter,
+        "historial": historial,
+        "historial_k": historial_k
+    }
+    x0, problema_inicial = _punto_inicial(datos, matriz_json, b)
+    if problema_inicial is not None:
+        input_data["x0_problema"] = problema_inicial.id
+    diagnostico = diagnosticar_sistema(A)
+    verificar_sor(diagnostico, omega)
+    if b.ndim == 2:
+        resolver = partial(sor_bloque, A, b, omega=omega, X0=x0, tol=tol, max_iter=max_iter,
+                           diagnostico=diagnostico)
+    else:
+        resolver = partial(sor, A, b, omega=omega, x0=x0, tol=tol, max_iter=max_iter,
+                           historial=historial, historial_k=historial_k,
+                           diagnostico=diagnostico)
+    return _responder("SOR", input_data, resolver, guardar, incluir_historial,
+                      datos.get("title", "Método SOR"))
+
+
+@api_bp.route("/sor/barrido", methods=["POST"])
+@api_login_required
+@_manejar_errores
+def sor_barrido_api():
+    datos = _cuerpo()
+    guardar, incluir_historial = _opciones(datos)
+    A, b = _sistema(datos)
+    if b.ndim != 1:
+        raise ErrorAPI("El barrido de ω necesita un solo vector b")
+    omega_min = _numero(datos, "omega_min", defecto=1.0)
+    omega_max = _numero(datos, "omega_max", defecto=1.95)
+    pasos = _numero(datos, "pasos", int, defecto=20)
+    if not 1 <= pasos <= MAX_PASOS_BARRIDO:
+        raise ErrorAPI(f"'pasos' debe estar entre 1 y {MAX_PASOS_BARRIDO}")
+    tol = _numero(datos, "tolerancia", defecto=1e-6)
+    max_iter = _numero(datos, "max_iter", int, defecto=1000)
+
+    input_data = {
+        "matriz": matriz_a_json(A),
+        "vector": b.tolist(),
+        "omega_min": omega_min,
+        "omega_max": omega_max,
+        "pasos": pasos,
+        "tolerancia": tol,
+        "max_iter": max_iter
+    }
+    title = datos.get("title", "Barrido de ω")
+    # Rechaza las diagonales con ceros antes de repartir las resoluciones
+    diagnostico = diagnosticar_sistema(A)
+    verificar_sor(diagnostico)
+    # Los barridos grandes (elementos × pasos) se resuelven en segundo plano
+    if (A.nnz if es_dispersa(A) else A.size) * pasos >= UMBRAL_ELEMENTOS_SEGUNDO_PLANO:
+        resolver = partial(sor_barrido_omega, A, b, omega_min=omega_min, omega_max=omega_max,
+                           pasos=pasos, tol=tol, max_iter=max_iter, diagnostico=diagnostico)
+        return _encolar("SOR", input_data, resolver, guardar, incluir_historial, title)
+    resolver = partial(sor_barrido_omega, A, b, omega_min=omega_min, omega_max=omega_max,
+                       pasos=pasos, tol=tol, max_iter=max_iter, diagnostico=diagnostico,
+                       mapear=trabajos.mapear_en_paralelo)
+    return _responder("SOR", input_data, resolver, guardar, incluir_historial, title)
+
+
+# ============================================================================
+# RAÍCES DE ECUACIONES
+# ============================================================================
+
+@api_bp.route("/raices", methods=["POST"])
+@api_login_required
+@_manejar_errores
+def raices_api():
+    datos = _cuerpo()
+    guardar, incluir_historial = _opciones(datos)
+    metodo = datos.get("metodo")
+    funcion = datos.get("funcion")
+    if not isinstance(funcion, str):
+        raise ErrorAPI("Falta el campo 'funcion' (texto)")
+    tol = _numero(datos, "tolerancia", defecto=1e-6)
+    max_iter = _numero(datos, "max_iter", int, defecto=100)
+
+    input_data = {
+        "funcion": funcion,
+        "metodo": metodo,
+        "tolerancia": tol,
+        "max_iter": max_iter
+    }
+
+    if metodo == "newton":
+        x0 = input_data["x0"] = _numero(datos, "x0")
+        resolver = partial(newton_raphson, funcion, x0, tol, max_iter)
+    elif metodo in ("biseccion", "brent"):
+        a = input_data["a"] = _numero(datos, "a")
+        b = input_data["b"] = _numero(datos, "b")
+        resolver = partial(biseccion if metodo == "biseccion" else brent, funcion, a, b, tol, max_iter)
+    elif metodo == "secante":
+        x0 = input_data["x0"] = _numero(datos, "x0")
+        x1 = input_data["x1"] = _numero(datos, "x1")
+        resolver = partial(secante, funcion, x0, x1, tol, max_iter)
+    elif metodo in ("newton_multiple", "secante_multiple"):
+        # Varios puntos iniciales: lista explícita o muestreo de [a, b]
+        if datos.get("puntos_iniciales"):
+            x0s = input_data["puntos_iniciales"] = [float(x) for x in datos["puntos_iniciales"]]
+            intervalo = None
+        else:
+            x0s = None
+            intervalo = (_numero(datos, "a"), _numero(datos, "b"))
+            input_data["a"], input_data["b"] = intervalo
+        muestras = input_data["muestras"] = _numero(datos, "muestras", int, defecto=100)
+        buscar = newton_raphson_multiple if metodo == "newton_multiple" else secante_multiple
+        resolver = partial(buscar, funcion, x0s=x0s, intervalo=intervalo, muestras=muestras,
+                           tol=tol, max_iter=max_iter)
+    else:
+        raise ErrorAPI(f"Método de raíces desconocido: {metodo}")
+
+    return _responder("ROOTS", input_data, resolver, guardar, incluir_historial,
+                      datos.get("title", "Raíces de Ecuaciones"))
+
+
+# ============================================================================
+# INTERPOLACIÓN
+# ============================================================================
+
+@api_bp.route("/interpolacion", methods=["POST"])
+@api_login_required
+@_manejar_errores
+def interpolacion_api():
+    datos = _cuerpo()
+    guardar, incluir_historial = _opciones(datos)
+    metodo = datos.get("metodo")
+    x_points = datos.get("x_points")
+    y_points = datos.get("y_points")
+    if not isinstance(x_points, list) or not isinstance(y_points, list):
+        raise ErrorAPI("Los campos 'x_points' e 'y_points' deben ser listas")
+    if len(x_points) != len(y_points):
+        raise ErrorAPI("Los vectores X e Y deben tener la misma longitud")
+    x_eval = datos.get("x_eval")
+    x_eval = float(x_eval) if x_eval is not None else None
+    incluir_tabla = bool(datos.get("incluir_tabla", False))
+
+    input_data = {
+        "metodo": metodo,
+        "x_points": x_points,
+        "y_points": y_points,
+        "x_eval": x_eval,
+        "incluir_tabla": incluir_tabla
+    }
+
+    if metodo == "lagrange":
+        resolver = partial(interpolacion_lagrange, x_points, y_points, x_eval)
+    elif metodo == "newton":
+        resolver = partial(interpolacion_newton, x_points, y_points, x_eval,
+                           incluir_tabla=incluir_tabla)
+    elif metodo == "spline":
+        resolver = partial(interpolacion_spline_cubico, x_points, y_points, x_eval)
+    else:
+        raise ErrorAPI(f"Método de interpolación desconocido: {metodo}")
+
+    return _responder("INTERPOLATION", input_data, resolver, guardar, incluir_historial,
+                      datos.get("title", "Interpolación"))
@@ -1,17 +1,127 @@
-from flask import Blueprint, request, redirect, url_for, flash, jsonify, render_template
+from flask import (Blueprint, request, redirect, url_for, flash, jsonify, render_template,
+                   current_app)
 from flask_login import login_required, current_user
 import json
+import os
+from datetime import datetime
+from functools import partial
 import numpy as np
 
 from utils.numerical_methods import (
-    gradiente_conjugado, sor, newton_raphson, biseccion, secante,
+    gradiente_conjugado, sor, gradiente_conjugado_bloque, sor_bloque, gradiente_conjugado_auto, sor_barrido_omega,
+    diagnosticar_sistema, verificar_cg, verificar_sor, MAX_PASOS_BARRIDO,
+    newton_raphson, biseccion, secante, brent,
+    newton_raphson_multiple, secante_multiple,
     interpolacion_lagrange, interpolacion_newton, interpolacion_spline_cubico
 )
+from utils.matrices import parsear_matriz, matriz_a_json, es_dispersa, leer_archivo_matriz
+from utils import trabajos
 from models.problem_model import Problem
+from models.job_model import Job, JobProgreso
 from views import method_view
 
 method_bp = Blueprint("method", __name__)
 
+POR_PAGINA_HISTORIAL = 50
+
+# Segundos entre consultas de la página de estado de un trabajo. Se sondea
+# en lugar de mantener una conexión abierta: con el worker síncrono de
+# gunicorn una conexión larga bloquea el sitio para los demás usuarios
+INTERVALO_SONDEO = 1.0
+
+# Tamaños a partir de los cuales se resuelve en segundo plano
+UMBRAL_ELEMENTOS_SEGUNDO_PLANO = int(os.environ.get("UMBRAL_ELEMENTOS_SEGUNDO_PLANO", 250_000))
+UMBRAL_PUNTOS_SEGUNDO_PLANO = int(os.environ.get("UMBRAL_PUNTOS_SEGUNDO_PLANO", 20_000))
+# Nodos de interpolación (las diferencias divididas de Newton son O(n²))
+UMBRAL_NODOS_SEGUNDO_PLANO = int(os.environ.get("UMBRAL_NODOS_SEGUNDO_PLANO", 3_000))
+
+
+def _elementos(A, b):
+    """Entradas almacenadas de la matriz (nnz si es dispersa) por cada lado derecho"""
+    columnas = b.shape[1] if b.ndim == 2 else 1
+    return (A.nnz if es_dispersa(A) else A.size) * columnas
+
+
+def _sistema_formulario():
+    """
+    Matriz A y vector b del formulario.
+
+    Los archivos subidos (.npy, .npz, CSV, Matrix Market) tienen prioridad
+    sobre los campos de texto; así las matrices grandes no pasan por JSON.
+    """
+    archivo = request.files.get("archivo_matriz")
+    if archivo and archivo.filename:
+        A = leer_archivo_matriz(archivo)
+    else:
+        A = parsear_matriz(request.form["matriz"])
+    
+    archivo = request.files.get("archivo_vector")
+    if archivo and archivo.filename:
+        b = leer_archivo_matriz(archivo, vector=True)
+        b = b.toarray() if es_dispersa(b) else b
+    else:
+        b = np.array(json.loads(request.form["vector"]), dtype=float)
+    return A, b
+
+
+def _punto_inicial(matriz_json, b):
+    """
+    Punto inicial x0 según el campo 'inicio' del formulario: (x0, problema
+    del que se tomó) o (None, None) para arrancar desde el vector cero.
+
+    'auto' usa la resolución más reciente del usuario con la misma matriz A;
+    'problema' usa la solución del problema indicado en 'problema_inicial'.
+    """
+    inicio = request.form.get("inicio", "cero")
+    if inicio == "auto":
+        return Problem.get_inicio_automatico(current_user.id, matriz_json, b)
+    if inicio != "problema":
+        return None, None
+    
+    problem = Problem.get_by_id(int(request.form["problema_inicial"]))
+    if not problem or (not current_user.has_role("admin") and problem.user_id != current_user.id):
+        raise ValueError("El problema indicado como punto inicial no existe")
+    x0 = problem.get_solucion_inicial(b)
+    if x0 is None:
+        raise ValueError(f"La solución del problema #{problem.id} no es compatible con este sistema")
+    return x0, problem
+
+
+def _resolver_y_guardar(method_type, input_data, title, resolver, segundo_plano=False):
+    """
+    Resuelve el problema y lo registra en el historial del usuario.
+
+    Si ya existe un problema con los mismos datos de entrada se reutiliza su
+    resultado: la nueva entrada del historial apunta a los datos guardados en
+    lugar de copiarlos. Con segundo_plano=True el solver se envía a la cola de
+    trabajos y se devuelve (None, job); si no, (resultado, None).
+
+    La resolución síncrona tiene un presupuesto de TIEMPO_MAX_SINCRONO
+    segundos: si se agota se guarda la mejor aproximación alcanzada.
+    """
+    origen = Problem.get_resuelto(method_type, input_data)
+    if origen is not None:
+        resultado = origen.get_result_data()
+        flash("Resultado reutilizado de un problema idéntico ya resuelto", "info")
+    elif segundo_plano:
+        job = trabajos.enviar(current_app._get_current_object(), current_user.id,
+                              method_type, input_data, title, resolver)
+        flash("El problema es grande y se está resolviendo en segundo plano", "info")
+        return None, job
+    else:
+        resultado = trabajos.limitar_tiempo(resolver, trabajos.TIEMPO_MAX_SINCRONO)()
+    
+    problem = Problem(
+        user_id=current_user.id,
+        method_type=method_type,
+        input_data=input_data,
+        result_data=resultado,
+        title=title,
+        origen=origen
+    )
+    problem.save()
+    return resultado, None
+
 
 # ============================================================================
 # PÁGINA PRINCIPAL - Métodos Numéricos
@@ -27,12 +137,23 @@ def index():
 @method_bp.route("/historial")
 @login_required
 def historial():
-    """Muestra el historial de problemas resueltos por el usuario"""
-    if current_user.has_role("admin"):
-        problems = Problem.get_all()
-    else:
-        problems = Problem.get_by_user(current_user.id)
-    return method_view.historial(problems)
+    """Muestra el historial de problemas resueltos por el usuario, paginado"""
+    user_id = None if current_user.has_role("admin") else current_user.id
+    
+    # Cursor de la página: "<created_at ISO>_<id>" del último problema mostrado
+    antes = None
+    cursor = request.args.get("antes")
+    if cursor:
+        try:
+            fecha, id = cursor.rsplit("_", 1)
+            antes = (datetime.fromisoformat(fecha), int(id))
+        except ValueError:
+            antes = None
+    
+    problems, siguiente = Problem.get_page(user_id=user_id, antes=antes, por_pagina=POR_PAGINA_HISTORIAL)
+    if siguiente:
+        siguiente = f"{siguiente[0].isoformat()}_{siguiente[1]}"
+    return method_view.historial(problems, siguiente, primera_pagina=antes is None)
 
 
 @method_bp.route("/historial/<int:id>")
@@ -71,6 +192,72 @@ def delete_problema(id):
     return redirect(url_for("method.historial"))
 
 
+# ============================================================================
+# TRABAJOS EN SEGUNDO PLANO
+# ============================================================================
+
+def _obtener_trabajo(id):
+    """Trabajo del usuario actual (o de cualquiera si es admin), o None"""
+    job = Job.get_by_id(id)
+    if job and (current_user.has_role("admin") or job.user_id == current_user.id):
+        return job
+    return None
+
+
+@method_bp.route("/trabajos/<int:id>")
+@login_required
+def ver_trabajo(id):
+    """Página de estado de un trabajo; consulta periódicamente estado_trabajo"""
+    job = _obtener_trabajo(id)
+    if not job:
+        flash("Trabajo no encontrado", "error")
+        return redirect(url_for("method.historial"))
+    return method_view.ver_trabajo(job, INTERVALO_SONDEO)
+
+
+@method_bp.route("/trabajos/<int:id>/estado")
+@login_required
+def estado_trabajo(id):
+    """Estado del trabajo en JSON"""
+    job = _obtener_trabajo(id)
+    if not job:
+        return jsonify({"error": "Trabajo no encontrado"}), 404
+    return jsonify(job.to_dict())
+
+
+@method_bp.route("/trabajos/<int:id>/progreso")
+@login_required
+def progreso_trabajo(id):
+    """
+    Avance del trabajo en JSON: los puntos de la curva de convergencia
+    posteriores a ?desde=<id del último punto recibido> y el estado del
+    trabajo. Responde al momento; la página de estado lo consulta cada
+    INTERVALO_SONDEO segundos.
+    """
+    job = _obtener_trabajo(id)
+    if not job:
+        return jsonify({"error": "Trabajo no encontrado"}), 404
+    
+    desde = request.args.get("desde", 0, type=int)
+    puntos = JobProgreso.get_desde(id, desde)
+    return jsonify({
+        "puntos": [punto.to_dict() for punto in puntos],
+        "ultimo": puntos[-1].id if puntos else desde,
+        "trabajo": job.to_dict()
+    })
+
+
+@method_bp.route("/trabajos/<int:id>/cancelar", methods=["POST"])
+@login_required
+def cancelar_trabajo(id):
+    """Pide la cancelación del trabajo"""
+    job = _obtener_trabajo(id)
+    if not job:
+        return jsonify({"error": "Trabajo no encontrado"}), 404
+    trabajos.cancelar(job)
+    return jsonify(job.to_dict())
+
+
 # ============================================================================
 # GRADIENTE CONJUGADO
 # ============================================================================
@@ -82,14 +269,15 @@ def gradiente_conjugado_view():
         try:
             # Obtener datos del formulario
             title = request.form.get("title", "Gradiente Conjugado")
-            matriz_str = request.form["matriz"]
-            vector_str = request.form["vector"]
             tol = float(request.form.get("tolerancia", 1e-6))
             max_iter = int(request.form.get("max_iter", 1000))
+            precondicionador = request.form.get("precondicionador") or None
+            historial = request.form.get("historial", "completo")
+            historial_k = int(request.form.get("historial_k", 10))
+            modo = request.form.get("modo", "iterativo")
             
-            # Parsear matriz y vector
-            A = np.array(json.loads(matriz_str))
-            b = np.array(json.loads(vector_str))
+            # Matriz (densa, tripletas, Matrix Market o archivo subido) y vector
+            A, b = _sistema_formulario()
             
             # Validar que A sea cuadrada
             if A.shape[0] != A.shape[1]:
@@ -101,29 +289,56 @@ def gradiente_conjugado_view():
                 flash("Las dimensiones de la matriz y el vector no coinciden", "error")
                 return redirect(url_for("method.gradiente_conjugado_view"))
             
-            # Resolver
-            resultado = gradiente_conjugado(A, b, tol=tol, max_iter=max_iter)
-            
-            # Guardar en BD
-            input_data = json.dumps({
-                "matriz": A.tolist(),
-                "vector": b.tolist(),
+            matriz_json = matriz_a_json(A)
+            input_data = {
+                "matriz": matriz_json,
+                "vector": b,
                 "tolerancia": tol,
-                "max_iter": max_iter
-            })
-            result_data = json.dumps(resultado)
-            
-            problem = Problem(
-                user_id=current_user.id,
-                method_type="CG",
-                input_data=input_data,
-                result_data=result_data,
-                title=title
+                "max_iter": max_iter,
+                "precondicionador": precondicionador,
+                "historial": historial,
+                "historial_k": historial_k,
+                "modo": modo
+            }
+            
+            # Arranque en caliente desde la solución de un sistema relacionado
+            x0, problema_inicial = _punto_inicial(matriz_json, b)
+            if problema_inicial is not None:
+                input_data["x0_problema"] = problema_inicial.id
+            
+            if modo == "auto":
+                # Factorización directa (en caché por huella de A) o CG según el tamaño
+                resolver = partial(gradiente_conjugado_auto, A, b, x0=x0, tol=tol, max_iter=max_iter,
+                                   precondicionador=precondicionador,
+                                   historial=historial, historial_k=historial_k)
+            else:
+                # Rechaza en milisegundos las matrices no simétricas o indefinidas,
+                # antes de ocupar un worker
+                diagnostico = diagnosticar_sistema(A)
+                verificar_cg(diagnostico)
+                if b.ndim == 2:
+                    # Varios lados derechos: una columna de b por sistema
+                    resolver = partial(gradiente_conjugado_bloque, A, b, X0=x0, tol=tol, max_iter=max_iter,
+                                       precondicionador=precondicionador, diagnostico=diagnostico)
+                else:
+                    resolver = partial(gradiente_conjugado, A, b, x0=x0, tol=tol, max_iter=max_iter,
+                                       precondicionador=precondicionador, diagnostico=diagnostico,
+                                       historial=historial, historial_k=historial_k)
+            
+            # Resolver (o reutilizar) y guardar en BD
+            resultado, job = _resolver_y_guardar(
+                "CG", input_data, title, resolver,
+                segundo_plano=_elementos(A, b) >= UMBRAL_ELEMENTOS_SEGUNDO_PLANO
             )
-            problem.save()
+            if job:
+                return redirect(url_for("method.ver_trabajo", id=job.id))
             
             flash("Problema resuelto exitosamente", "success")
-            return method_view.resultado_cg(resultado, A.tolist(), b.tolist())
+            if problema_inicial is not None:
+                flash(f"Punto inicial: solución del problema #{problema_inicial.id}", "info")
+            if b.ndim == 2:
+                return method_view.resultado_sistema_multiple(resultado, "CG", matriz_json, b.tolist())
+            return method_view.resultado_cg(resultado, matriz_json, b.tolist())
             
         except Exception as e:
             flash(f"Error al resolver: {str(e)}", "error")
@@ -142,15 +357,15 @@ def sor_view():
     if request.method == "POST":
         try:
             title = request.form.get("title", "Método SOR")
-            matriz_str = request.form["matriz"]
-            vector_str = request.form["vector"]
-            omega = float(request.form.get("omega", 1.5))
+            omega = request.form.get("omega", "1.5").strip().lower()
+            omega = "auto" if omega == "auto" else float(omega)
             tol = float(request.form.get("tolerancia", 1e-6))
             max_iter = int(request.form.get("max_iter", 1000))
+            historial = request.form.get("historial", "completo")
+            historial_k = int(request.form.get("historial_k", 10))
             
-            # Parsear matriz y vector
-            A = np.array(json.loads(matriz_str))
-            b = np.array(json.loads(vector_str))
+            # Matriz (densa, tripletas, Matrix Market o archivo subido) y vector
+            A, b = _sistema_formulario()
             
             # Validaciones
             if A.shape[0] != A.shape[1]:
@@ -161,30 +376,52 @@ def sor_view():
                 flash("Las dimensiones no coinciden", "error")
                 return redirect(url_for("method.sor_view"))
             
-            # Resolver
-            resultado = sor(A, b, omega=omega, tol=tol, max_iter=max_iter)
+            matriz_json = matriz_a_json(A)
+            
+            if request.form.get("accion") == "barrido":
+                return _barrido_omega(title, A, b, matriz_json, tol, max_iter)
             
-            # Guardar en BD
-            input_data = json.dumps({
-                "matriz": A.tolist(),
-                "vector": b.tolist(),
+            input_data = {
+                "matriz": matriz_json,
+                "vector": b,
                 "omega": omega,
                 "tolerancia": tol,
-                "max_iter": max_iter
-            })
-            result_data = json.dumps(resultado)
-            
-            problem = Problem(
-                user_id=current_user.id,
-                method_type="SOR",
-                input_data=input_data,
-                result_data=result_data,
-                title=title
+                "max_iter": max_iter,
+                "historial": historial,
+                "historial_k": historial_k
+            }
+            
+            # Arranque en caliente desde la solución de un sistema relacionado
+            x0, problema_inicial = _punto_inicial(matriz_json, b)
+            if problema_inicial is not None:
+                input_data["x0_problema"] = problema_inicial.id
+            
+            # Rechaza las diagonales con ceros y los ω fuera de (0, 2) antes de iterar
+            diagnostico = diagnosticar_sistema(A)
+            verificar_sor(diagnostico, omega)
+            if b.ndim == 2:
+                # Varios lados derechos: una columna de b por sistema
+                resolver = partial(sor_bloque, A, b, omega=omega, X0=x0, tol=tol, max_iter=max_iter,
+                                   diagnostico=diagnostico)
+            else:
+                resolver = partial(sor, A, b, omega=omega, x0=x0, tol=tol, max_iter=max_iter,
+                                   historial=historial, historial_k=historial_k,
+                                   diagnostico=diagnostico)
+            
+            # Resolver (o reutilizar) y guardar en BD
+            resultado, job = _resolver_y_guardar(
+                "SOR", input_data, title, resolver,
+                segundo_plano=_elementos(A, b) >= UMBRAL_ELEMENTOS_SEGUNDO_PLANO
             )
-            problem.save()
+            if job:
+                return redirect(url_for("method.ver_trabajo", id=job.id))
             
             flash("Problema resuelto exitosamente", "success")
-            return method_view.resultado_sor(resultado, A.tolist(), b.tolist())
+            if problema_inicial is not None:
+                flash(f"Punto inicial: solución del problema #{problema_inicial.id}", "info")
+            if b.ndim == 2:
+                return method_view.resultado_sistema_multiple(resultado, "SOR", matriz_json, b.tolist())
+            return method_view.resultado_sor(resultado, matriz_json, b.tolist())
             
         except Exception as e:
             flash(f"Error al resolver: {str(e)}", "error")
@@ -193,6 +430,47 @@ def sor_view():
     return method_view.sor_form()
 
 
+def _barrido_omega(title, A, b, matriz_json, tol, max_iter):
+    """
+    Barrido de ω del formulario SOR. Los barridos pequeños se resuelven en
+    paralelo dentro de la petición; los grandes (elementos × pasos) van a la
+    cola de trabajos, donde se resuelven en serie en el proceso del trabajo.
+    """
+    if b.ndim != 1:
+        flash("El barrido de ω necesita un solo vector b", "error")
+        return redirect(url_for("method.sor_view"))
+    omega_min = float(request.form.get("omega_min", 1.0))
+    omega_max = float(request.form.get("omega_max", 1.95))
+    pasos = int(request.form.get("pasos", 20))
+    if not 1 <= pasos <= MAX_PASOS_BARRIDO:
+        flash(f"El barrido admite entre 1 y {MAX_PASOS_BARRIDO} valores de ω", "error")
+        return redirect(url_for("method.sor_view"))
+    
+    input_data = {
+        "matriz": matriz_json,
+        "vector": b,
+        "omega_min": omega_min,
+        "omega_max": omega_max,
+        "pasos": pasos,
+        "tolerancia": tol,
+        "max_iter": max_iter
+    }
+    # Rechaza las diagonales con ceros antes de repartir las resoluciones
+    diagnostico = diagnosticar_sistema(A)
+    verificar_sor(diagnostico)
+    segundo_plano = _elementos(A, b) * pasos >= UMBRAL_ELEMENTOS_SEGUNDO_PLANO
+    resolver = partial(sor_barrido_omega, A, b, omega_min=omega_min, omega_max=omega_max,
+                       pasos=pasos, tol=tol, max_iter=max_iter, diagnostico=diagnostico,
+                       mapear=map if segundo_plano else trabajos.mapear_en_paralelo)
+    resultado, job = _resolver_y_guardar("SOR", input_data, title, resolver,
+                                         segundo_plano=segundo_plano)
+    if job:
+        return redirect(url_for("method.ver_trabajo", id=job.id))
+    
+    flash("Barrido de ω completado", "success")
+    return method_view.resultado_barrido_omega(resultado, matriz_json, b.tolist())
+
+
 # ============================================================================
 # RAÍCES DE ECUACIONES
 # ============================================================================
@@ -208,7 +486,8 @@ def raices_view():
             tol = float(request.form.get("tolerancia", 1e-6))
             max_iter = int(request.form.get("max_iter", 100))
             
-            resultado = None
+            resolver = None
+            segundo_plano = False
             input_data = {
                 "funcion": funcion,
                 "metodo": metodo,
@@ -219,34 +498,59 @@ def raices_view():
             if metodo == "newton":
                 x0 = float(request.form["x0"])
                 input_data["x0"] = x0
-                resultado = newton_raphson(funcion, x0, tol, max_iter)
+                resolver = partial(newton_raphson, funcion, x0, tol, max_iter)
                 
             elif metodo == "biseccion":
                 a = float(request.form["a"])
                 b = float(request.form["b"])
                 input_data["a"] = a
                 input_data["b"] = b
-                resultado = biseccion(funcion, a, b, tol, max_iter)
+                resolver = partial(biseccion, funcion, a, b, tol, max_iter)
+                
+            elif metodo == "brent":
+                a = float(request.form["a"])
+                b = float(request.form["b"])
+                input_data["a"] = a
+                input_data["b"] = b
+                resolver = partial(brent, funcion, a, b, tol, max_iter)
                 
             elif metodo == "secante":
                 x0 = float(request.form["x0"])
                 x1 = float(request.form["x1"])
                 input_data["x0"] = x0
                 input_data["x1"] = x1
-                resultado = secante(funcion, x0, x1, tol, max_iter)
-            
-            if resultado:
-                # Guardar en BD
-                problem = Problem(
-                    user_id=current_user.id,
-                    method_type="ROOTS",
-                    input_data=json.dumps(input_data),
-                    result_data=json.dumps(resultado),
-                    title=title
-                )
-                problem.save()
+                resolver = partial(secante, funcion, x0, x1, tol, max_iter)
+                
+            elif metodo in ("newton_multiple", "secante_multiple"):
+                # Varios puntos iniciales: lista explícita o muestreo de [a, b]
+                puntos_str = request.form.get("puntos_iniciales", "").strip()
+                if puntos_str:
+                    x0s = json.loads(puntos_str)
+                    intervalo = None
+                    input_data["puntos_iniciales"] = x0s
+                else:
+                    x0s = None
+                    intervalo = (float(request.form["a_multiple"]), float(request.form["b_multiple"]))
+                    input_data["a"], input_data["b"] = intervalo
+                muestras = int(request.form.get("muestras", 100))
+                input_data["muestras"] = muestras
+                
+                buscar = newton_raphson_multiple if metodo == "newton_multiple" else secante_multiple
+                resolver = partial(buscar, funcion, x0s=x0s, intervalo=intervalo, muestras=muestras,
+                                   tol=tol, max_iter=max_iter)
+                puntos = len(x0s) if x0s is not None else muestras
+                segundo_plano = puntos >= UMBRAL_PUNTOS_SEGUNDO_PLANO
+            
+            if resolver:
+                # Resolver (o reutilizar) y guardar en BD
+                resultado, job = _resolver_y_guardar("ROOTS", input_data, title, resolver,
+                                                     segundo_plano=segundo_plano)
+                if job:
+                    return redirect(url_for("method.ver_trabajo", id=job.id))
                 
                 flash("Problema resuelto exitosamente", "success")
+                if "raices" in resultado:
+                    return method_view.resultado_raices_multiple(resultado, funcion, metodo)
                 return method_view.resultado_raices(resultado, funcion, metodo)
             
         except Exception as e:
@@ -270,6 +574,7 @@ def interpolacion_view():
             x_points_str = request.form["x_points"]
             y_points_str = request.form["y_points"]
             x_eval = request.form.get("x_eval", None)
+            incluir_tabla = request.form.get("tabla_diferencias") is not None
             
             # Parsear puntos
             x_points = json.loads(x_points_str)
@@ -279,42 +584,34 @@ def interpolacion_view():
                 flash("Los vectores X e Y deben tener la misma longitud", "error")
                 return redirect(url_for("method.interpolacion_view"))
             
-            if x_eval:
-                x_eval = float(x_eval)
+            x_eval = float(x_eval) if x_eval else None
             
-            resultado = None
+            input_data = {
+                "metodo": metodo,
+                "x_points": x_points,
+                "y_points": y_points,
+                "x_eval": x_eval,
+                "incluir_tabla": incluir_tabla
+            }
+            
+            resolver = None
             
             if metodo == "lagrange":
-                resultado = interpolacion_lagrange(x_points, y_points, x_eval)
+                resolver = partial(interpolacion_lagrange, x_points, y_points, x_eval)
             elif metodo == "newton":
-                resultado = interpolacion_newton(x_points, y_points, x_eval)
+                resolver = partial(interpolacion_newton, x_points, y_points, x_eval,
+                                   incluir_tabla=incluir_tabla)
             elif metodo == "spline":
-                resultado = interpolacion_spline_cubico(x_points, y_points)
-                if x_eval:
-                    # Evaluar spline en x_eval usando numpy
-                    from scipy.interpolate import CubicSpline
-                    cs = CubicSpline(x_points, y_points, bc_type='natural')
-                    resultado['x_evaluado'] = x_eval
-                    resultado['y_evaluado'] = float(cs(x_eval))
-            
-            if resultado:
-                # Guardar en BD
-                input_data = json.dumps({
-                    "metodo": metodo,
-                    "x_points": x_points,
-                    "y_points": y_points,
-                    "x_eval": x_eval
-                })
-                result_data = json.dumps(resultado)
-                
-                problem = Problem(
-                    user_id=current_user.id,
-                    method_type="INTERPOLATION",
-                    input_data=input_data,
-                    result_data=result_data,
-                    title=title
+                resolver = partial(interpolacion_spline_cubico, x_points, y_points, x_eval)
+            
+            if resolver:
+                # Resolver (o reutilizar) y guardar en BD
+                resultado, job = _resolver_y_guardar(
+                    "INTERPOLATION", input_data, title, resolver,
+                    segundo_plano=len(x_points) >= UMBRAL_NODOS_SEGUNDO_PLANO
                 )
-                problem.save()
+                if job:
+                    return redirect(url_for("method.ver_trabajo", id=job.id))
                 
                 flash("Interpolación realizada exitosamente", "success")
                 return method_view.resultado_interpolacion(resultado, metodo)
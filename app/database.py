@@ -1,4 +1,27 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import inspect, text
 
 # Crea una instancia de `SQLAlchemy`
-db = SQLAlchemy()
\ No newline at end of file
+db = SQLAlchemy()
+
+
+def actualizar_esquema():
+    """
+    Agrega a las tablas existentes las columnas e índices nuevos del modelo.
+
+    db.create_all() solo crea tablas que no existen; las bases de datos
+    creadas con versiones anteriores necesitan este paso. Las columnas nuevas
+    deben ser nullable para poder agregarse sobre filas existentes.
+    """
+    inspector = inspect(db.engine)
+    for tabla in db.metadata.sorted_tables:
+        if not inspector.has_table(tabla.name):
+            continue
+        existentes = {columna['name'] for columna in inspector.get_columns(tabla.name)}
+        for columna in tabla.columns:
+            if columna.name not in existentes:
+                tipo = columna.type.compile(dialect=db.engine.dialect)
+                with db.engine.begin() as conexion:
+                    conexion.execute(text(f'ALTER TABLE {tabla.name} ADD COLUMN {columna.name} {tipo}'))
+        for indice in tabla.indexes:
+            indice.create(bind=db.engine, checkfirst=True)
@@ -3,6 +3,7 @@ Script para inicializar la base de datos con usuarios por defecto
 Útil para producción o cuando necesites resetear la BD
 """
 from run import app, db
+from database import actualizar_esquema
 from models.user_model import User
 
 def init_database():
@@ -10,6 +11,7 @@ def init_database():
     with app.app_context():
         print("🔧 Creando tablas...")
         db.create_all()
+        actualizar_esquema()
         print("✅ Tablas creadas")
         
         # Verificar si ya existen usuarios
@@ -0,0 +1,84 @@
+from database import db
+from datetime import datetime
+
+
+class Job(db.Model):
+    """Resolución en segundo plano; al terminar apunta al Problem guardado"""
+    __tablename__ = "jobs"
+
+    # pendiente -> ejecutando -> completado | error | cancelado
+    ESTADOS = ('pendiente', 'ejecutando', 'completado', 'error', 'cancelado')
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    method_type = db.Column(db.String(50), nullable=False)
+    title = db.Column(db.String(200), nullable=True)
+    estado = db.Column(db.String(20), nullable=False, default='pendiente')
+    mensaje = db.Column(db.Text, nullable=True)  # Mensaje de error si estado == 'error'
+    cancelar = db.Column(db.Boolean, nullable=True, default=False)  # Cancelación pedida por el usuario
+    problem_id = db.Column(db.Integer, db.ForeignKey('problems.id', ondelete='SET NULL'), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    def __init__(self, user_id, method_type, title=None):
+        self.user_id = user_id
+        self.method_type = method_type
+        self.title = title
+        self.estado = 'pendiente'
+
+    @property
+    def terminado(self):
+        return self.estado in ('completado', 'error', 'cancelado')
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'method_type': self.method_type,
+            'title': self.title,
+            'estado': self.estado,
+            'mensaje': self.mensaje,
+            'cancelar': bool(self.cancelar),
+            'problem_id': self.problem_id,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+
+    def save(self):
+        db.session.add(self)
+        db.session.commit()
+
+    @staticmethod
+    def get_by_id(id):
+        return Job.query.get(id)
+
+
+class JobProgreso(db.Model):
+    """Punto de la curva de convergencia reportado por un trabajo en ejecución"""
+    __tablename__ = "job_progreso"
+
+    id = db.Column(db.Integer, primary_key=True)
+    job_id = db.Column(db.Integer, db.ForeignKey('jobs.id', ondelete='CASCADE'), nullable=False, index=True)
+    iteracion = db.Column(db.Integer, nullable=False)
+    error = db.Column(db.Float, nullable=False)  # Residuo (CG) o error entre iterados (SOR)
+    tiempo = db.Column(db.Float, nullable=False)  # Segundos desde el inicio de la iteración
+
+    def to_dict(self):
+        return {
+            'iteracion': self.iteracion,
+            'error': self.error,
+            'tiempo': self.tiempo
+        }
+
+    @staticmethod
+    def get_desde(job_id, ultimo_id=0):
+        """Puntos del trabajo posteriores a ultimo_id, en orden"""
+        return JobProgreso.query.filter(
+            JobProgreso.job_id == job_id, JobProgreso.id > ultimo_id
+        ).order_by(JobProgreso.id).all()
+
+    @staticmethod
+    def eliminar_de(job_id):
+        """Borra la curva del trabajo (sin commit: va con el estado final)"""
+        JobProgreso.query.filter(JobProgreso.job_id == job_id).delete(synchronize_session=False)
@@ -1,27 +1,127 @@
+import numpy as np
 from database import db
 from datetime import datetime
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import joinedload
+from utils.almacenamiento import empaquetar, desempaquetar, huella_entrada, huella_matriz
 
 
 class Problem(db.Model):
     __tablename__ = "problems"
+    __table_args__ = (
+        # Índices para la paginación del historial por (created_at, id)
+        db.Index('ix_problems_user_created', 'user_id', 'created_at', 'id'),
+        db.Index('ix_problems_created', 'created_at', 'id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     method_type = db.Column(db.String(50), nullable=False)  # 'CG', 'SOR', 'ROOTS', 'INTERPOLATION'
-    input_data = db.Column(db.Text, nullable=False)  # JSON string con los parámetros de entrada
-    result_data = db.Column(db.Text, nullable=False)  # JSON string con los resultados
+    # Los datos se cargan solo al acceder a ellos (todos juntos en una consulta),
+    # de modo que el listado del historial no los lee
+    input_data = db.deferred(db.Column(db.Text, nullable=False), group='datos')  # JSON string con los parámetros de entrada
+    result_data = db.deferred(db.Column(db.Text, nullable=False), group='datos')  # JSON string con los resultados
+    # Arreglos grandes de input_data/result_data en formato .npz comprimido
+    # (None en los problemas guardados antes del formato compacto)
+    input_blob = db.deferred(db.Column(db.LargeBinary, nullable=True), group='datos')
+    result_blob = db.deferred(db.Column(db.LargeBinary, nullable=True), group='datos')
+    # Hash de (method_type, datos de entrada normalizados) para reutilizar resultados
+    huella_entrada = db.Column(db.String(64), nullable=True, index=True)
+    # Hash de la matriz A (solo CG y SOR) para arrancar desde la solución de un sistema con la misma A
+    huella_matriz = db.Column(db.String(64), nullable=True, index=True)
+    # Problema idéntico que guarda los datos compartidos (None si este los guarda)
+    origen_id = db.Column(db.Integer, db.ForeignKey('problems.id'), nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     title = db.Column(db.String(200), nullable=True)  # Título descriptivo del problema
 
     # Relación con User
     user = db.relationship('User', backref=db.backref('problems', lazy=True))
+    origen = db.relationship('Problem', remote_side=[id])
 
-    def __init__(self, user_id, method_type, input_data, result_data, title=None):
+    def __init__(self, user_id, method_type, input_data, result_data, title=None, origen=None):
         self.user_id = user_id
         self.method_type = method_type
-        self.input_data = input_data
-        self.result_data = result_data
         self.title = title
+        if not isinstance(input_data, str) and not Problem.es_parcial(result_data):
+            self.huella_entrada = huella_entrada(method_type, input_data)
+        if isinstance(input_data, dict) and method_type in ('CG', 'SOR') and 'matriz' in input_data:
+            self.huella_matriz = huella_matriz(input_data['matriz'])
+        if origen is not None:
+            # Entrada propia en el historial que apunta a los datos ya guardados
+            self.origen = origen
+            self.input_data = self.result_data = ''
+        else:
+            self.set_input_data(input_data)
+            self.set_result_data(result_data)
+
+    def set_input_data(self, datos):
+        """Guarda los datos de entrada (dict) en formato compacto; acepta también texto JSON"""
+        if isinstance(datos, str):
+            self.input_data, self.input_blob = datos, None
+        else:
+            self.input_data, self.input_blob = empaquetar(datos)
+
+    def set_result_data(self, datos):
+        """Guarda el resultado (dict) en formato compacto; acepta también texto JSON"""
+        if isinstance(datos, str):
+            self.result_data, self.result_blob = datos, None
+        else:
+            self.result_data, self.result_blob = empaquetar(datos)
+
+    def get_input_data(self):
+        fuente = self.origen or self
+        return desempaquetar(fuente.input_data, fuente.input_blob)
+
+    def get_result_data(self):
+        fuente = self.origen or self
+        return desempaquetar(fuente.result_data, fuente.result_blob)
+
+    def get_solucion_inicial(self, b):
+        """
+        Solución guardada como punto inicial para el lado derecho b (vector
+        o matriz n x m), o None si no hay una solución finita compatible.
+        Una solución de un solo sistema sirve para todas las columnas de b.
+        """
+        solucion = self.get_result_data().get('solucion')
+        if solucion is None:
+            return None
+        x0 = np.asarray(solucion, dtype=float)
+        if b.ndim == 2 and x0.shape == (b.shape[0],):
+            x0 = np.repeat(x0[:, np.newaxis], b.shape[1], axis=1)
+        if x0.shape != b.shape or not np.all(np.isfinite(x0)):
+            return None
+        return x0
+
+    @staticmethod
+    def get_inicio_automatico(user_id, matriz, b, candidatos=10):
+        """
+        (x0, problema) a partir de la resolución más reciente del usuario con
+        la misma matriz A, o (None, None). Se revisan los últimos candidatos
+        porque algunos resultados no tienen una solución utilizable (barridos
+        de ω, lados derechos de otra forma).
+        """
+        problems = Problem.query.filter_by(user_id=user_id, huella_matriz=huella_matriz(matriz)) \
+            .order_by(Problem.created_at.desc(), Problem.id.desc()).limit(candidatos).all()
+        for problem in problems:
+            x0 = problem.get_solucion_inicial(b)
+            if x0 is not None:
+                return x0, problem
+        return None, None
+
+    @staticmethod
+    def es_parcial(result_data):
+        """True si el resultado es el de una resolución interrumpida (cancelada o sin tiempo)"""
+        if not isinstance(result_data, dict):
+            return False
+        return bool(result_data.get('cancelado')) or result_data.get('motivo') in ('timeout', 'cancelado')
+
+    @staticmethod
+    def get_resuelto(method_type, input_data):
+        """Problema ya resuelto con los mismos datos de entrada, o None"""
+        return Problem.query.filter_by(
+            huella_entrada=huella_entrada(method_type, input_data),
+            origen_id=None
+        ).order_by(Problem.id).first()
 
     def save(self):
         db.session.add(self)
@@ -39,10 +139,46 @@ class Problem(db.Model):
     def get_by_user(user_id):
         return Problem.query.filter_by(user_id=user_id).order_by(Problem.created_at.desc()).all()
 
+    @staticmethod
+    def get_page(user_id=None, antes=None, por_pagina=25):
+        """
+        Página del historial, del más reciente al más antiguo.
+
+        Usa paginación por clave (keyset) sobre (created_at, id): antes es el
+        par (created_at, id) del último problema de la página anterior, por lo
+        que el costo no depende de cuántas páginas se hayan recorrido.
+        Devuelve (problemas, cursor de la página siguiente o None).
+        """
+        query = Problem.query.options(joinedload(Problem.user))
+        if user_id is not None:
+            query = query.filter(Problem.user_id == user_id)
+        if antes is not None:
+            fecha, id = antes
+            query = query.filter(or_(
+                Problem.created_at < fecha,
+                and_(Problem.created_at == fecha, Problem.id < id)
+            ))
+
+        problems = query.order_by(Problem.created_at.desc(), Problem.id.desc()).limit(por_pagina + 1).all()
+        if len(problems) > por_pagina:
+            problems = problems[:por_pagina]
+            ultimo = problems[-1]
+            return problems, (ultimo.created_at, ultimo.id)
+        return problems, None
+
     @staticmethod
     def get_by_method(method_type):
         return Problem.query.filter_by(method_type=method_type).order_by(Problem.created_at.desc()).all()
 
     def delete(self):
+        copias = Problem.query.filter_by(origen_id=self.id).order_by(Problem.id).all()
+        if copias:
+            # La copia más antigua pasa a guardar los datos compartidos
+            nuevo = copias[0]
+            nuevo.origen = None
+            nuevo.input_data, nuevo.input_blob = self.input_data, self.input_blob
+            nuevo.result_data, nuevo.result_blob = self.result_data, self.result_blob
+            for copia in copias[1:]:
+                copia.origen = nuevo
         db.session.delete(self)
         db.session.commit()
@@ -1,13 +1,15 @@
 from flask import Flask
 from flask_login import LoginManager
+from werkzeug.security import check_password_hash
 import os
 
 # Importamos los controladores
 from controllers import user_controller
 from controllers import method_controller
+from controllers import api_controller
 
 # Importamos la base de datos
-from database import db
+from database import db, actualizar_esquema
 from models.user_model import User
 
 # Inicializa la aplicación Flask
@@ -16,6 +18,8 @@ app = Flask(__name__)
 app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get("DATABASE_URL", "sqlite:///analisis_numerico.db")
 app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
 app.config["SECRET_KEY"] = os.environ.get("SECRET_KEY", "clave-secreta-analisis-numerico-2025")
+# Tamaño máximo de los archivos de matrices subidos (MB)
+app.config["MAX_CONTENT_LENGTH"] = int(os.environ.get("MAX_TAMANO_SUBIDA_MB", 200)) * 1024 * 1024
 # Configuración de Flask-Login
 login_manager = LoginManager()
 # Especifica la ruta de inicio de sesión
@@ -29,18 +33,31 @@ def load_user(user_id):
     return User.query.get(int(user_id))
 
 
+# Autenticación HTTP Basic para los clientes de la API JSON (sin sesión)
+@login_manager.request_loader
+def load_user_from_request(request):
+    auth = request.authorization
+    if auth and auth.type == "basic" and auth.username:
+        user = User.get_user_by_username(auth.username)
+        if user and check_password_hash(user.password_hash, auth.password or ""):
+            return user
+    return None
+
+
 # Inicializa `db` con la aplicación Flask
 db.init_app(app)
 # Registra los Blueprints
 app.register_blueprint(user_controller.user_bp)
 app.register_blueprint(method_controller.method_bp)
+app.register_blueprint(api_controller.api_bp)
 
 
 def init_database_and_users():
     """Inicializa la base de datos y crea usuarios por defecto si no existen"""
     with app.app_context():
-        # Crear tablas
+        # Crear tablas y agregar columnas nuevas a tablas existentes
         db.create_all()
+        actualizar_esquema()
         
         # Verificar si ya existen usuarios
         existing_users = User.query.count()
@@ -84,6 +101,7 @@ except Exception as e:
     # Intentar al menos crear las tablas
     with app.app_context():
         db.create_all()
+        actualizar_esquema()
         print("✅ Tablas creadas (sin usuarios por defecto)")
 
 
@@ -0,0 +1,72 @@
+"""
+Pruebas de regresión de los solvers de utils.numerical_methods
+"""
+import os
+import sys
+import warnings
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.numerical_methods import (  # noqa: E402
+    gradiente_conjugado, gradiente_conjugado_bloque, brent, biseccion, interpolacion_lagrange
+)
+
+
+# ============================================================================
+# GRADIENTE CONJUGADO - Arranque en caliente desde la solución exacta
+# ============================================================================
+
+A = np.array([[4.0, 1.0], [1.0, 3.0]])
+b = np.array([1.0, 2.0])
+
+
+def test_cg_desde_solucion_exacta():
+    x0 = np.linalg.solve(A, b)
+    for precondicionador in (None, 'jacobi'):
+        resultado = gradiente_conjugado(A, b, x0=x0, precondicionador=precondicionador)
+        assert resultado['convergencia']
+        assert resultado['iteraciones_totales'] == 0
+        assert resultado['solucion'] == x0.tolist()
+
+
+def test_cg_bloque_desde_solucion_exacta():
+    B = np.column_stack([b, [3.0, -1.0]])
+    X0 = np.column_stack([np.linalg.solve(A, b), np.zeros(2)])
+    resultado = gradiente_conjugado_bloque(A, B, X0=X0)
+    assert resultado['convergencia']
+    assert resultado['columnas'][0]['iteraciones'] == 0
+    assert resultado['columnas'][0]['solucion'] == X0[:, 0].tolist()
+    assert np.allclose(A @ np.array(resultado['solucion']), B)
+
+
+# ============================================================================
+# RAÍCES - Brent
+# ============================================================================
+
+def test_brent_evalua_menos_que_biseccion():
+    resultado = brent('tan(x)', -1, 1.5, tol=1e-10)
+    referencia = biseccion('tan(x)', -1, 1.5, tol=1e-10)
+    assert resultado['convergencia']
+    assert abs(resultado['raiz']) < 1e-10
+    assert resultado['evaluaciones_funcion'] <= 15
+    assert resultado['evaluaciones_funcion'] < referencia['evaluaciones_funcion'] / 2
+
+
+def test_brent_cuadratica():
+    resultado = brent('x**2 - 2', 0, 2, tol=1e-12)
+    assert resultado['convergencia']
+    assert abs(resultado['raiz'] - np.sqrt(2)) < 1e-12
+    assert resultado['evaluaciones_funcion'] < 15
+
+
+# ============================================================================
+# INTERPOLACIÓN - Evaluación en los nodos
+# ============================================================================
+
+def test_lagrange_en_un_nodo_sin_avisos():
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        assert interpolacion_lagrange([0, 1, 2, 3], [1, 3, 2, 5], 2)['y_evaluado'] == 2.0
+        assert interpolacion_lagrange([0, 1, 2, 3], [1, 3, 2, 5], 1e-320)['y_evaluado'] == 1.0
@@ -0,0 +1,118 @@
+"""
+Formato compacto para guardar los datos de entrada y resultados de un problema
+
+Los arreglos numéricos grandes (matrices, vectores, historial de iterados)
+se extraen del diccionario y se guardan como buffers de NumPy comprimidos;
+el resto (escalares, textos, listas pequeñas) queda en JSON legible, con una
+referencia {"__arreglo__": "a0"} en el lugar de cada arreglo extraído.
+"""
+import io
+import json
+import numpy as np
+from typing import Any, Dict, Optional, Tuple
+
+from utils.cache import huella
+
+# Las listas numéricas con menos elementos se dejan en el JSON
+MIN_ELEMENTOS_ARREGLO = 16
+
+CLAVE_REFERENCIA = '__arreglo__'
+
+
+def _como_arreglo(valor) -> Optional[np.ndarray]:
+    """Devuelve la lista (o arreglo) como arreglo si es numérica, rectangular y grande"""
+    try:
+        arreglo = np.asarray(valor)
+    except ValueError:
+        # Listas irregulares (filas de distinta longitud)
+        return None
+    if arreglo.dtype.kind not in 'iuf' or arreglo.size < MIN_ELEMENTOS_ARREGLO:
+        return None
+    return arreglo
+
+
+def _extraer(valor: Any, arreglos: Dict[str, np.ndarray]) -> Any:
+    if isinstance(valor, dict):
+        return {clave: _extraer(v, arreglos) for clave, v in valor.items()}
+    if isinstance(valor, (list, tuple, np.ndarray)):
+        arreglo = _como_arreglo(valor)
+        if arreglo is not None:
+            nombre = f"a{len(arreglos)}"
+            arreglos[nombre] = arreglo
+            return {CLAVE_REFERENCIA: nombre}
+        if isinstance(valor, np.ndarray):
+            return valor.tolist()
+        return [_extraer(v, arreglos) for v in valor]
+    return valor
+
+
+def _restaurar(valor: Any, arreglos) -> Any:
+    if isinstance(valor, dict):
+        if set(valor) == {CLAVE_REFERENCIA}:
+            return arreglos[valor[CLAVE_REFERENCIA]].tolist()
+        return {clave: _restaurar(v, arreglos) for clave, v in valor.items()}
+    if isinstance(valor, list):
+        return [_restaurar(v, arreglos) for v in valor]
+    return valor
+
+
+def empaquetar(datos: Dict[str, Any]) -> Tuple[str, Optional[bytes]]:
+    """
+    Separa los datos en (JSON con metadatos, blob .npz comprimido).
+
+    El blob es None si no hay arreglos grandes que extraer.
+    """
+    arreglos = {}
+    metadatos = _extraer(datos, arreglos)
+    texto = json.dumps(metadatos)
+    if not arreglos:
+        return texto, None
+
+    buffer = io.BytesIO()
+    np.savez_compressed(buffer, **arreglos)
+    return texto, buffer.getvalue()
+
+
+def desempaquetar(texto: str, blob: Optional[bytes] = None) -> Dict[str, Any]:
+    """
+    Reconstruye el diccionario original. Las filas antiguas (solo JSON, sin
+    blob) se leen directamente.
+    """
+    datos = json.loads(texto)
+    if not blob:
+        return datos
+    with np.load(io.BytesIO(blob), allow_pickle=False) as arreglos:
+        return _restaurar(datos, arreglos)
+
+
+def _normalizar(valor: Any) -> Any:
+    """
+    Forma canónica de los datos de entrada: números como float, textos sin
+    espacios en los extremos y arreglos grandes reemplazados por su hash.
+    """
+    if isinstance(valor, dict):
+        return {clave: _normalizar(v) for clave, v in valor.items()}
+    if isinstance(valor, (list, tuple, np.ndarray)):
+        arreglo = _como_arreglo(valor)
+        if arreglo is not None:
+            return huella(arreglo.astype(float, copy=False))
+        if isinstance(valor, np.ndarray):
+            valor = valor.tolist()
+        return [_normalizar(v) for v in valor]
+    if isinstance(valor, bool) or valor is None:
+        return valor
+    if isinstance(valor, (int, float, np.number)):
+        return float(valor)
+    if isinstance(valor, str):
+        return valor.strip()
+    return valor
+
+
+def huella_entrada(method_type: str, datos: Dict[str, Any]) -> str:
+    """Hash de (método, datos de entrada normalizados) para reconocer problemas idénticos"""
+    return huella(method_type, json.dumps(_normalizar(datos), sort_keys=True))
+
+
+def huella_matriz(matriz: Any) -> str:
+    """Hash de la matriz A de un sistema (densa o en tripletas) para reconocer sistemas con la misma A"""
+    return huella('matriz', json.dumps(_normalizar(matriz), sort_keys=True))
@@ -0,0 +1,86 @@
+"""
+Caché LRU en memoria (por proceso de trabajo) con límite de bytes
+"""
+import hashlib
+import threading
+import numpy as np
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Tuple
+
+
+def huella(*partes: Any) -> str:
+    """
+    Hash SHA-256 de una secuencia de textos, números y arreglos de NumPy.
+
+    Los arreglos se incluyen con su tipo y forma, de modo que [1, 2] y
+    [[1], [2]] producen huellas distintas.
+    """
+    h = hashlib.sha256()
+    for parte in partes:
+        if isinstance(parte, np.ndarray):
+            arreglo = np.ascontiguousarray(parte)
+            h.update(f"{arreglo.dtype.str}{arreglo.shape}".encode())
+            h.update(memoryview(arreglo).cast('B'))
+        else:
+            h.update(repr(parte).encode())
+        h.update(b'\x00')
+    return h.hexdigest()
+
+
+class CacheLRU:
+    """
+    Caché LRU con presupuesto de memoria.
+
+    Cada entrada declara su tamaño en bytes al construirse; al superar
+    max_bytes se descartan las entradas usadas hace más tiempo. Una entrada
+    que por sí sola excede el presupuesto se devuelve sin guardarse.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entradas = OrderedDict()
+        self._bytes = 0
+        self._aciertos = 0
+        self._fallos = 0
+        self._lock = threading.Lock()
+
+    def obtener(self, clave: str, construir: Callable[[], Tuple[Any, int]]) -> Any:
+        """Devuelve el valor de la clave, construyéndolo con construir() si falta"""
+        with self._lock:
+            if clave in self._entradas:
+                self._entradas.move_to_end(clave)
+                self._aciertos += 1
+                return self._entradas[clave][0]
+            self._fallos += 1
+
+        # La construcción (un ajuste o una factorización) se hace fuera del lock
+        valor, nbytes = construir()
+        if nbytes > self.max_bytes:
+            return valor
+
+        with self._lock:
+            if clave not in self._entradas:
+                self._entradas[clave] = (valor, nbytes)
+                self._bytes += nbytes
+                while self._bytes > self.max_bytes:
+                    _, (_, liberados) = self._entradas.popitem(last=False)
+                    self._bytes -= liberados
+        return valor
+
+    def __contains__(self, clave: str) -> bool:
+        with self._lock:
+            return clave in self._entradas
+
+    def limpiar(self):
+        with self._lock:
+            self._entradas.clear()
+            self._bytes = 0
+
+    def estadisticas(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'entradas': len(self._entradas),
+                'bytes': self._bytes,
+                'aciertos': self._aciertos,
+                'fallos': self._fallos
+            }
@@ -1,5 +1,5 @@
 from functools import wraps
-from flask import flash, redirect, url_for
+from flask import flash, redirect, url_for, jsonify
 from flask_login import current_user
 
 
@@ -16,3 +16,14 @@ def role_required(role):
         return decorated_function
 
     return decorator
+
+
+def api_login_required(f):
+    """Como login_required, pero responde 401 en JSON en lugar de redirigir al login"""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if not current_user.is_authenticated:
+            return jsonify({"error": "Autenticación requerida"}), 401
+        return f(*args, **kwargs)
+
+    return decorated_function
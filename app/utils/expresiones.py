@@ -0,0 +1,317 @@
+"""
+Compilación segura de expresiones f(x) ingresadas por el usuario
+"""
+import ast
+import math
+import numpy as np
+from functools import lru_cache
+from typing import Callable, Tuple
+
+
+# Funciones permitidas: nombre -> (versión escalar, versión vectorizada)
+FUNCIONES = {
+    'sin': (math.sin, np.sin),
+    'cos': (math.cos, np.cos),
+    'tan': (math.tan, np.tan),
+    'arcsin': (math.asin, np.arcsin),
+    'arccos': (math.acos, np.arccos),
+    'arctan': (math.atan, np.arctan),
+    'asin': (math.asin, np.arcsin),
+    'acos': (math.acos, np.arccos),
+    'atan': (math.atan, np.arctan),
+    'sinh': (math.sinh, np.sinh),
+    'cosh': (math.cosh, np.cosh),
+    'tanh': (math.tanh, np.tanh),
+    'exp': (math.exp, np.exp),
+    'log': (math.log, np.log),
+    'log10': (math.log10, np.log10),
+    'log2': (math.log2, np.log2),
+    'sqrt': (math.sqrt, np.sqrt),
+    'abs': (abs, np.abs),
+    'fabs': (math.fabs, np.fabs),
+}
+
+CONSTANTES = {
+    'pi': math.pi,
+    'e': math.e,
+}
+
+# Prefijos aceptados para compatibilidad con la notación np.sin(x), math.exp(x)
+MODULOS = ('np', 'numpy', 'math')
+
+VARIABLE = 'x'
+
+_OPERADORES = (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Pow, ast.Mod,
+               ast.USub, ast.UAdd)
+
+
+class _Normalizador(ast.NodeTransformer):
+    """
+    Valida el árbol contra la lista blanca y reescribe np.f / math.f como f.
+    """
+
+    def generic_visit(self, node):
+        permitidos = (ast.Expression, ast.BinOp, ast.UnaryOp, ast.Call,
+                      ast.Name, ast.Attribute, ast.Constant, ast.Load) + _OPERADORES
+        if not isinstance(node, permitidos):
+            raise ValueError(f"Expresión no permitida: {type(node).__name__}")
+        return super().generic_visit(node)
+
+    def visit_Constant(self, node):
+        if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+            raise ValueError(f"Constante no permitida: {node.value!r}")
+        # Los enteros se pasan a float para que 9**9**9 desborde en lugar de
+        # construir un entero gigantesco
+        return ast.copy_location(ast.Constant(value=float(node.value)), node)
+
+    def visit_Attribute(self, node):
+        nombre = self._nombre_atributo(node)
+        if nombre not in CONSTANTES:
+            raise ValueError(f"Constante no permitida: {nombre}")
+        return ast.copy_location(ast.Name(id=nombre, ctx=ast.Load()), node)
+
+    def visit_Name(self, node):
+        if node.id != VARIABLE and node.id not in CONSTANTES:
+            raise ValueError(f"Nombre desconocido: {node.id}")
+        return node
+
+    def visit_Call(self, node):
+        if node.keywords or len(node.args) != 1:
+            raise ValueError("Las funciones reciben exactamente un argumento")
+        if isinstance(node.func, ast.Attribute):
+            nombre = self._nombre_atributo(node.func)
+        elif isinstance(node.func, ast.Name):
+            nombre = node.func.id
+        else:
+            raise ValueError("Llamada no permitida")
+        if nombre not in FUNCIONES:
+            raise ValueError(f"Función no permitida: {nombre}")
+        node.func = ast.copy_location(ast.Name(id=nombre, ctx=ast.Load()), node.func)
+        node.args = [self.visit(node.args[0])]
+        return node
+
+    @staticmethod
+    def _nombre_atributo(node: ast.Attribute) -> str:
+        if not (isinstance(node.value, ast.Name) and node.value.id in MODULOS):
+            raise ValueError("Solo se permiten atributos de np o math")
+        return node.attr
+
+
+def _log(u):
+    """Logaritmo natural escalar (math) o elemento a elemento (NumPy)"""
+    return np.log(u) if isinstance(u, np.ndarray) else math.log(u)
+
+
+class Dual:
+    """
+    Número dual v + d·ε (ε² = 0) para diferenciación automática en modo
+    directo: evaluar f(Dual(x, 1)) devuelve f(x) y f'(x) en una sola pasada.
+    v y d pueden ser floats o arreglos de NumPy.
+    """
+    __slots__ = ('v', 'd')
+
+    def __init__(self, v: float, d: float = 0.0):
+        self.v = v
+        self.d = d
+
+    def __add__(self, otro):
+        if isinstance(otro, Dual):
+            return Dual(self.v + otro.v, self.d + otro.d)
+        return Dual(self.v + otro, self.d)
+
+    __radd__ = __add__
+
+    def __sub__(self, otro):
+        if isinstance(otro, Dual):
+            return Dual(self.v - otro.v, self.d - otro.d)
+        return Dual(self.v - otro, self.d)
+
+    def __rsub__(self, otro):
+        return Dual(otro - self.v, -self.d)
+
+    def __mul__(self, otro):
+        if isinstance(otro, Dual):
+            return Dual(self.v * otro.v, self.d * otro.v + self.v * otro.d)
+        return Dual(self.v * otro, self.d * otro)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, otro):
+        if isinstance(otro, Dual):
+            return Dual(self.v / otro.v,
+                        (self.d * otro.v - self.v * otro.d) / (otro.v * otro.v))
+        return Dual(self.v / otro, self.d / otro)
+
+    def __rtruediv__(self, otro):
+        return Dual(otro / self.v, -otro * self.d / (self.v * self.v))
+
+    def __pow__(self, otro):
+        if isinstance(otro, Dual):
+            valor = self.v ** otro.v
+            return Dual(valor, valor * (otro.d * _log(self.v) + otro.v * self.d / self.v))
+        return Dual(self.v ** otro, otro * self.v ** (otro - 1) * self.d)
+
+    def __rpow__(self, otro):
+        valor = otro ** self.v
+        return Dual(valor, valor * _log(otro) * self.d)
+
+    def __mod__(self, otro):
+        if isinstance(otro, Dual):
+            raise TypeError("Derivada no disponible para el módulo de una variable")
+        return Dual(self.v % otro, self.d)
+
+    def __neg__(self):
+        return Dual(-self.v, -self.d)
+
+    def __pos__(self):
+        return self
+
+
+def _regla_cadena(f: Callable, df: Callable) -> Callable:
+    """Extiende f a números duales usando su derivada df"""
+    def f_dual(u):
+        if isinstance(u, Dual):
+            return Dual(f(u.v), df(u.v) * u.d)
+        return f(u)
+    return f_dual
+
+
+# Derivadas de las funciones permitidas, para evaluar con números duales
+DERIVADAS = {
+    'sin': math.cos,
+    'cos': lambda u: -math.sin(u),
+    'tan': lambda u: 1.0 / math.cos(u) ** 2,
+    'arcsin': lambda u: 1.0 / math.sqrt(1.0 - u * u),
+    'arccos': lambda u: -1.0 / math.sqrt(1.0 - u * u),
+    'arctan': lambda u: 1.0 / (1.0 + u * u),
+    'asin': lambda u: 1.0 / math.sqrt(1.0 - u * u),
+    'acos': lambda u: -1.0 / math.sqrt(1.0 - u * u),
+    'atan': lambda u: 1.0 / (1.0 + u * u),
+    'sinh': math.cosh,
+    'cosh': math.sinh,
+    'tanh': lambda u: 1.0 - math.tanh(u) ** 2,
+    'exp': math.exp,
+    'log': lambda u: 1.0 / u,
+    'log10': lambda u: 1.0 / (u * math.log(10)),
+    'log2': lambda u: 1.0 / (u * math.log(2)),
+    'sqrt': lambda u: 0.5 / math.sqrt(u),
+    'abs': lambda u: math.copysign(1.0, u),
+    'fabs': lambda u: math.copysign(1.0, u),
+}
+
+
+DERIVADAS_VECTORIZADAS = {
+    'sin': np.cos,
+    'cos': lambda u: -np.sin(u),
+    'tan': lambda u: 1.0 / np.cos(u) ** 2,
+    'arcsin': lambda u: 1.0 / np.sqrt(1.0 - u * u),
+    'arccos': lambda u: -1.0 / np.sqrt(1.0 - u * u),
+    'arctan': lambda u: 1.0 / (1.0 + u * u),
+    'asin': lambda u: 1.0 / np.sqrt(1.0 - u * u),
+    'acos': lambda u: -1.0 / np.sqrt(1.0 - u * u),
+    'atan': lambda u: 1.0 / (1.0 + u * u),
+    'sinh': np.cosh,
+    'cosh': np.sinh,
+    'tanh': lambda u: 1.0 - np.tanh(u) ** 2,
+    'exp': np.exp,
+    'log': lambda u: 1.0 / u,
+    'log10': lambda u: 1.0 / (u * np.log(10)),
+    'log2': lambda u: 1.0 / (u * np.log(2)),
+    'sqrt': lambda u: 0.5 / np.sqrt(u),
+    'abs': np.sign,
+    'fabs': np.sign,
+}
+
+
+class FuncionCompilada:
+    """
+    Expresión f(x) validada y compilada una sola vez.
+
+    Llamarla evalúa la versión escalar (funciones de math); `vectorizada`
+    evalúa sobre arreglos de NumPy y `con_derivada` devuelve (f(x), f'(x))
+    mediante números duales. `arbol` conserva el AST normalizado.
+    """
+
+    def __init__(self, texto: str, arbol: ast.Expression, escalar: Callable,
+                 vectorizada: Callable, dual: Callable, dual_vectorizada: Callable):
+        self.texto = texto
+        self.arbol = arbol
+        self.escalar = escalar
+        self.vectorizada = vectorizada
+        self.dual = dual
+        self.dual_vectorizada = dual_vectorizada
+
+    def __call__(self, x: float) -> float:
+        return self.escalar(x)
+
+    def con_derivada(self, x: float) -> Tuple[float, float]:
+        """Evalúa f(x) y la derivada exacta f'(x) en una sola pasada"""
+        resultado = self.dual(Dual(x, 1.0))
+        if isinstance(resultado, Dual):
+            return resultado.v, resultado.d
+        return resultado, 0.0
+
+    def con_derivada_vectorizada(self, x: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Versión de con_derivada sobre un arreglo de puntos"""
+        x = np.asarray(x, dtype=float)
+        resultado = self.dual_vectorizada(Dual(x, np.ones_like(x)))
+        if isinstance(resultado, Dual):
+            v, d = resultado.v, resultado.d
+        else:
+            v, d = resultado, 0.0
+        return (np.broadcast_to(v, x.shape).astype(float),
+                np.broadcast_to(d, x.shape).astype(float))
+
+
+def parsear_expresion(func_str: str) -> ast.Expression:
+    """Convierte el texto en un AST validado contra la lista blanca"""
+    try:
+        arbol = ast.parse(func_str.strip(), mode='eval')
+    except SyntaxError as e:
+        raise ValueError(f"Sintaxis inválida en la función: {e.msg}")
+    return ast.fix_missing_locations(_Normalizador().visit(arbol))
+
+
+def _compilar_lambda(arbol: ast.Expression, espacio: dict) -> Callable:
+    """Compila `lambda x: <expresión>` con el espacio de nombres dado"""
+    argumentos = ast.arguments(posonlyargs=[], args=[ast.arg(arg=VARIABLE)],
+                               kwonlyargs=[], kw_defaults=[], defaults=[])
+    lambda_ = ast.Expression(body=ast.Lambda(args=argumentos, body=arbol.body))
+    codigo = compile(ast.fix_missing_locations(lambda_), '<funcion>', 'eval')
+    return eval(codigo, {'__builtins__': {}, **espacio})
+
+
+@lru_cache(maxsize=256)
+def compilar_funcion(func_str: str) -> FuncionCompilada:
+    """
+    Devuelve la función compilada para func_str (en caché LRU por texto).
+
+    Lanza ValueError si la expresión usa algo fuera de la lista blanca.
+    """
+    arbol = parsear_expresion(func_str)
+
+    escalar = _compilar_lambda(arbol, {
+        **CONSTANTES, **{nombre: f[0] for nombre, f in FUNCIONES.items()}
+    })
+    f_vec = _compilar_lambda(arbol, {
+        **CONSTANTES, **{nombre: f[1] for nombre, f in FUNCIONES.items()}
+    })
+
+    dual = _compilar_lambda(arbol, {
+        **CONSTANTES,
+        **{nombre: _regla_cadena(f[0], DERIVADAS[nombre]) for nombre, f in FUNCIONES.items()}
+    })
+
+    dual_vectorizada = _compilar_lambda(arbol, {
+        **CONSTANTES,
+        **{nombre: _regla_cadena(f[1], DERIVADAS_VECTORIZADAS[nombre])
+           for nombre, f in FUNCIONES.items()}
+    })
+
+    def vectorizada(x):
+        x = np.asarray(x, dtype=float)
+        # Las expresiones constantes devuelven un escalar: se expanden a la forma de x
+        return np.broadcast_to(f_vec(x), x.shape).astype(float)
+
+    return FuncionCompilada(func_str, arbol, escalar, vectorizada, dual,
+                            dual_vectorizada)
@@ -0,0 +1,170 @@
+"""
+Lectura y serialización de matrices densas y dispersas (CSR)
+"""
+import io
+import os
+import json
+import numpy as np
+from scipy import sparse
+from typing import Any, Dict, Union
+
+Matriz = Union[np.ndarray, sparse.csr_matrix]
+
+
+def es_dispersa(A: Any) -> bool:
+    """Indica si A es una matriz dispersa de SciPy"""
+    return sparse.issparse(A)
+
+
+def parsear_matriz(texto: str) -> Matriz:
+    """
+    Convierte el texto recibido del formulario en una matriz.
+
+    Formatos aceptados:
+        - Lista JSON de filas: [[4, 1], [1, 3]] -> np.ndarray denso
+        - Tripletas JSON: {"n": 2, "filas": [0, 1], "columnas": [0, 1],
+          "valores": [4, 3]} -> CSR (admite "forma": [m, n] en lugar de "n")
+        - Texto Matrix Market (comienza con %%MatrixMarket) -> CSR
+    """
+    texto = texto.strip()
+
+    if texto.startswith('%%MatrixMarket'):
+        from scipy.io import mmread
+        A = mmread(io.StringIO(texto))
+        if sparse.issparse(A):
+            return sparse.csr_matrix(A, dtype=float)
+        return np.asarray(A, dtype=float)
+
+    datos = json.loads(texto)
+    if isinstance(datos, dict):
+        return matriz_desde_tripletas(datos)
+    return np.array(datos, dtype=float)
+
+
+def matriz_desde_json(dato: Any) -> Matriz:
+    """
+    Convierte una matriz ya decodificada de un cuerpo JSON: lista de filas,
+    diccionario de tripletas o texto (ver parsear_matriz).
+    """
+    if isinstance(dato, str):
+        return parsear_matriz(dato)
+    if isinstance(dato, dict):
+        return matriz_desde_tripletas(dato)
+    return np.array(dato, dtype=float)
+
+
+def matriz_desde_tripletas(datos: Dict[str, Any]) -> sparse.csr_matrix:
+    """Construye una matriz CSR a partir de un diccionario de tripletas"""
+    if 'forma' in datos:
+        forma = tuple(int(d) for d in datos['forma'])
+    else:
+        n = int(datos['n'])
+        forma = (n, n)
+
+    filas = np.asarray(datos['filas'], dtype=np.int64)
+    columnas = np.asarray(datos['columnas'], dtype=np.int64)
+    valores = np.asarray(datos['valores'], dtype=float)
+
+    if not (len(filas) == len(columnas) == len(valores)):
+        raise ValueError("Las listas de filas, columnas y valores deben tener la misma longitud")
+
+    # Las entradas repetidas se suman, como en el formato COO de SciPy
+    return sparse.coo_matrix((valores, (filas, columnas)), shape=forma).tocsr()
+
+
+def matriz_a_json(A: Matriz) -> Union[np.ndarray, Dict[str, Any]]:
+    """
+    Representación serializable de la matriz (ver utils.almacenamiento).
+
+    Las matrices densas se devuelven como arreglo de filas y las dispersas
+    como tripletas, de modo que nunca se expanden a n x n. Los datos quedan
+    en arreglos de NumPy, sin pasar por listas de Python.
+    """
+    if sparse.issparse(A):
+        coo = A.tocoo()
+        return {
+            'formato': 'coo',
+            'forma': list(coo.shape),
+            'nnz': int(coo.nnz),
+            'filas': coo.row,
+            'columnas': coo.col,
+            'valores': coo.data
+        }
+    return np.asarray(A)
+
+
+# ============================================================================
+# ARCHIVOS SUBIDOS
+# ============================================================================
+
+EXTENSIONES_ARCHIVO = ('.npy', '.npz', '.csv', '.txt', '.mtx', '.mm')
+
+
+def _delimitador_csv(stream) -> Union[str, None]:
+    """Detecta el separador de columnas a partir de la primera línea con datos"""
+    posicion = stream.tell()
+    linea = b''
+    for linea in stream:
+        if linea.strip() and not linea.lstrip().startswith(b'#'):
+            break
+    stream.seek(posicion)
+    for separador in (b',', b';', b'\t'):
+        if separador in linea:
+            return separador.decode()
+    return None  # espacios en blanco
+
+
+def _leer_npy(stream) -> np.ndarray:
+    """
+    Lee un .npy directamente del archivo subido, sin archivos temporales.
+
+    El tamaño ya está acotado por MAX_TAMANO_SUBIDA_MB, así que el arreglo se
+    carga en memoria; un memmap obligaría a conservar un archivo temporal que
+    en Windows no puede borrarse mientras está mapeado.
+    """
+    arreglo = np.load(stream, allow_pickle=False)
+    if not isinstance(arreglo, np.ndarray) or arreglo.dtype.kind not in 'iuf':
+        tipo = arreglo.dtype if isinstance(arreglo, np.ndarray) else 'desconocido'
+        raise ValueError(f"El archivo .npy debe contener números (tipo {tipo})")
+    # Los float64 se usan tal cual (sin copia); otros tipos se convierten
+    return arreglo if arreglo.dtype == np.float64 else arreglo.astype(np.float64)
+
+
+def leer_archivo_matriz(archivo, vector: bool = False) -> Matriz:
+    """
+    Lee una matriz (o un vector) de un archivo subido (werkzeug FileStorage).
+
+    Formatos según la extensión:
+        .npy        arreglo de NumPy
+        .npz        matriz dispersa guardada con scipy.sparse.save_npz -> CSR
+        .csv, .txt  texto numérico separado por comas, punto y coma,
+                    tabuladores o espacios -> float64
+        .mtx, .mm   Matrix Market -> CSR (o denso si el archivo es 'array')
+
+    Todos se leen directamente a un arreglo float64 o una matriz dispersa,
+    sin listas de Python intermedias. Con vector=True, un archivo de una sola
+    fila o columna se devuelve como vector 1-D.
+    """
+    nombre = (archivo.filename or '').lower()
+    extension = os.path.splitext(nombre)[1]
+    if extension not in EXTENSIONES_ARCHIVO:
+        raise ValueError(f"Formato de archivo no admitido: '{extension or nombre}' "
+                         f"(se aceptan {', '.join(EXTENSIONES_ARCHIVO)})")
+    stream = archivo.stream
+
+    if extension == '.npy':
+        A = _leer_npy(stream)
+    elif extension == '.npz':
+        A = sparse.load_npz(io.BytesIO(stream.read())).tocsr().astype(np.float64)
+    elif extension in ('.mtx', '.mm'):
+        from scipy.io import mmread
+        A = mmread(stream)
+        A = sparse.csr_matrix(A, dtype=np.float64) if sparse.issparse(A) else np.asarray(A, dtype=np.float64)
+    else:
+        # Lector en C de NumPy: llena el arreglo float64 sin crear floats de Python
+        A = np.loadtxt(stream, delimiter=_delimitador_csv(stream), dtype=np.float64,
+                       comments='#', ndmin=2)
+
+    if vector and not sparse.issparse(A) and A.ndim == 2 and 1 in A.shape:
+        return A.reshape(-1)
+    return A
@@ -1,73 +1,853 @@
 """
 Implementaciones de métodos numéricos para Análisis Numérico
 """
+import time
+import warnings
+from collections import deque
+from functools import partial
 import numpy as np
+from scipy import sparse
 from typing import List, Tuple, Callable, Dict, Any
 
+from utils.cache import CacheLRU, huella
+from utils.expresiones import compilar_funcion
+
+
+def _como_matriz_float(A) -> Any:
+    """Convierte A a float64 conservando el formato CSR si es dispersa"""
+    if sparse.issparse(A):
+        return sparse.csr_matrix(A, dtype=float)
+    return np.asarray(A, dtype=float)
+
+
+def _escalar_filas(d: np.ndarray, X: np.ndarray) -> np.ndarray:
+    """d_i · X[i] para X vector (n) o matriz (n x m, una columna por lado derecho)"""
+    return (X.T * d).T
+
+
+def _solver_triangular(M, lower: bool) -> Callable[[np.ndarray], np.ndarray]:
+    """
+    Devuelve una función que resuelve M y = r para M triangular.
+
+    Las matrices dispersas se factorizan una sola vez con SuperLU en orden
+    natural y sin pivoteo (no hay relleno), de modo que cada solución cuesta
+    O(nnz).
+    """
+    if sparse.issparse(M):
+        from scipy.sparse.linalg import splu
+        M_lu = splu(sparse.csc_matrix(M), permc_spec='NATURAL', diag_pivot_thresh=0)
+        return M_lu.solve
+
+    from scipy.linalg import solve_triangular
+    return lambda r: solve_triangular(M, r, lower=lower, check_finite=False)
+
+
+class _HistorialIteraciones:
+    """
+    Registro de iterados x_k según una política de historial:
+
+        'completo'   todos los iterados (comportamiento original)
+        'ninguno'    no se guarda ninguno
+        'cada_k'     uno de cada k iterados, más el último
+        'ultimos_k'  solo los k últimos
+        'muestreado' a lo sumo k iterados repartidos en toda la ejecución,
+                     más el último (cuando se llena se descarta uno de cada
+                     dos y el paso de muestreo se duplica)
+
+    Solo se copia x cuando la política lo va a conservar.
+    """
+    POLITICAS = ('completo', 'ninguno', 'cada_k', 'ultimos_k', 'muestreado')
+
+    def __init__(self, politica: str = 'completo', k: int = 10):
+        if politica not in self.POLITICAS:
+            raise ValueError(f"Política de historial desconocida: {politica}")
+        if politica in ('cada_k', 'ultimos_k', 'muestreado') and k < 1:
+            raise ValueError("El parámetro k del historial debe ser al menos 1")
+        self.politica = politica
+        self.k = k
+        self.paso = k if politica == 'cada_k' else 1
+        self.indices = deque(maxlen=k) if politica == 'ultimos_k' else []
+        self.iterados = deque(maxlen=k) if politica == 'ultimos_k' else []
+
+    def agregar(self, iteracion: int, x: np.ndarray):
+        if self.politica == 'ninguno' or iteracion % self.paso != 0:
+            return
+        self.indices.append(iteracion)
+        self.iterados.append(x.copy())
+        if self.politica == 'muestreado' and len(self.iterados) > self.k:
+            self.paso *= 2
+            conservar = [i for i, idx in enumerate(self.indices) if idx % self.paso == 0]
+            self.indices = [self.indices[i] for i in conservar]
+            self.iterados = [self.iterados[i] for i in conservar]
+
+    def exportar(self, iteracion_final: int, x_final: np.ndarray) -> Dict[str, Any]:
+        """Claves del historial para el dict de resultados"""
+        if self.politica == 'completo':
+            return {'historial_x': [iter_x.tolist() for iter_x in self.iterados]}
+        
+        indices = list(self.indices)
+        iterados = [iter_x.tolist() for iter_x in self.iterados]
+        if self.politica in ('cada_k', 'muestreado') and iteracion_final > 0 and \
+                (not indices or indices[-1] != iteracion_final):
+            indices.append(iteracion_final)
+            iterados.append(x_final.tolist())
+        return {
+            'historial_x': iterados,
+            'historial_indices': indices,
+            'politica_historial': self.politica
+        }
+
+
+class _Progreso:
+    """
+    Control de la iteración de un solver, consultado una vez por iteración.
+
+    Reporta el avance llamando a callback(iteracion, error, tiempo) como
+    máximo una vez cada intervalo segundos; si el callback devuelve True la
+    resolución se cancela. Además detiene la iteración al agotarse el
+    presupuesto de tiempo_max segundos (motivo 'timeout') o si se activa el
+    token de cancelación, cualquier objeto con is_set() como
+    threading.Event (motivo 'cancelado').
+    """
+
+    def __init__(self, callback: Callable[[int, float, float], bool] = None,
+                 intervalo: float = 0.5, tiempo_max: float = None, cancelacion: Any = None):
+        self.callback = callback
+        self.intervalo = intervalo
+        self.cancelacion = cancelacion
+        self.inicio = time.perf_counter()
+        self.limite = None if tiempo_max is None else self.inicio + tiempo_max
+        self.ultimo = float('-inf')
+        self.cancelado = False
+        self.motivo = None
+
+    def _detener(self, motivo: str) -> bool:
+        self.motivo = motivo
+        self.cancelado = motivo == 'cancelado'
+        return True
+
+    def __call__(self, iteracion: int, error: float) -> bool:
+        """Devuelve True si hay que detener la iteración"""
+        if self.cancelacion is not None and self.cancelacion.is_set():
+            return self._detener('cancelado')
+        if self.limite is None and self.callback is None:
+            return False
+        ahora = time.perf_counter()
+        if self.limite is not None and ahora >= self.limite:
+            return self._detener('timeout')
+        if self.callback is None or ahora - self.ultimo < self.intervalo:
+            return False
+        self.ultimo = ahora
+        if self.callback(iteracion, float(error), ahora - self.inicio):
+            return self._detener('cancelado')
+        return False
+
+    def interrumpido(self) -> Dict[str, Any]:
+        """Claves del resultado de una resolución que no convergió"""
+        return {'cancelado': self.cancelado, 'motivo': self.motivo or 'max_iter'}
+
+
+# ============================================================================
+# DIAGNÓSTICO - Aplicabilidad de CG y SOR antes de iterar
+# ============================================================================
+
+# Orden hasta el que el diagnóstico intenta Cholesky si Gershgorin no decide
+MAX_N_CHOLESKY_DIAGNOSTICO = 1000
+
+
+class SistemaNoAplicable(ValueError):
+    """El método no es aplicable a la matriz; 'diagnostico' explica por qué"""
+
+    def __init__(self, mensaje: str, diagnostico: Dict[str, Any]):
+        super().__init__(mensaje)
+        self.diagnostico = diagnostico
+
+
+def _asimetria(A) -> float:
+    """max |A - Aᵀ| relativo a max |A| (0 si A es simétrica)"""
+    if sparse.issparse(A):
+        diferencia = abs(A - A.T)
+        escala = abs(A).max() if A.nnz else 0.0
+        maximo = diferencia.max() if diferencia.nnz else 0.0
+    else:
+        escala = np.abs(A).max() if A.size else 0.0
+        maximo = np.abs(A - A.T).max() if A.size else 0.0
+    return float(maximo / escala) if escala else 0.0
+
+
+def _es_simetrica(A, tol: float = 1e-12) -> bool:
+    return _asimetria(A) <= tol
+
+
+def diagnosticar_sistema(A) -> Dict[str, Any]:
+    """
+    Pre-análisis de A en O(nnz): simetría, diagonal, dominancia diagonal,
+    discos de Gershgorin y, si hace falta, un intento de Cholesky.
+
+    Returns:
+        Dict con 'simetrica', 'asimetria' (max |A - Aᵀ| / max |A|),
+        'diagonal_positiva', 'ceros_diagonal', 'dominancia_diagonal'
+        ('estricta', 'debil' o 'no'), 'gershgorin' ([mín, máx] de la unión
+        de los discos), 'definida_positiva' (True, False o None si no se
+        pudo decidir, solo para matrices simétricas), 'prueba_definida' y
+        'tiempo' del análisis
+    """
+    inicio = time.perf_counter()
+    A = _como_matriz_float(A)
+    n = A.shape[0]
+    if sparse.issparse(A):
+        d = A.diagonal()
+        finita = bool(np.isfinite(A.data).all())
+        suma_filas = np.asarray(abs(A).sum(axis=1)).ravel()
+    else:
+        d = np.diag(A)
+        finita = bool(np.isfinite(A).all())
+        suma_filas = np.abs(A).sum(axis=1)
+    # Radios de Gershgorin: suma de |a_ij| fuera de la diagonal
+    radios = suma_filas - np.abs(d)
+    diagnostico = {
+        'n': n,
+        'finita': finita,
+        'simetrica': False,
+        'asimetria': None,
+        'diagonal_positiva': bool(np.all(d > 0)),
+        'ceros_diagonal': int(np.count_nonzero(d == 0)),
+        'dominancia_diagonal': 'no',
+        'gershgorin': None,
+        'definida_positiva': None,
+        'prueba_definida': None
+    }
+    if not finita or n == 0:
+        diagnostico['tiempo'] = time.perf_counter() - inicio
+        return diagnostico
+
+    asimetria = _asimetria(A)
+    simetrica = asimetria <= 1e-12
+    if np.all(np.abs(d) > radios):
+        dominancia = 'estricta'
+    elif np.all(np.abs(d) >= radios):
+        dominancia = 'debil'
+    else:
+        dominancia = 'no'
+    diagnostico.update({
+        'simetrica': bool(simetrica),
+        'asimetria': asimetria,
+        'dominancia_diagonal': dominancia,
+        'gershgorin': [float((d - radios).min()), float((d + radios).max())]
+    })
+
+    if simetrica:
+        if not diagnostico['diagonal_positiva']:
+            # a_ii = eᵢᵀAeᵢ ≤ 0: no puede ser definida positiva
+            definida, prueba = False, 'diagonal'
+        elif diagnostico['gershgorin'][0] > 0:
+            # Todos los autovalores (reales) están en discos a la derecha del 0
+            definida, prueba = True, 'gershgorin'
+        elif n <= MAX_N_CHOLESKY_DIAGNOSTICO:
+            try:
+                np.linalg.cholesky(A.toarray() if sparse.issparse(A) else A)
+                definida = True
+            except np.linalg.LinAlgError:
+                definida = False
+            prueba = 'cholesky'
+        else:
+            definida, prueba = None, None
+        diagnostico['definida_positiva'] = definida
+        diagnostico['prueba_definida'] = prueba
+
+    diagnostico['tiempo'] = time.perf_counter() - inicio
+    return diagnostico
+
+
+def verificar_cg(diagnostico: Dict[str, Any]) -> None:
+    """Lanza SistemaNoAplicable si el diagnóstico descarta el Gradiente Conjugado"""
+    if not diagnostico['finita']:
+        raise SistemaNoAplicable("La matriz contiene valores no finitos (NaN o infinito)", diagnostico)
+    if not diagnostico['simetrica']:
+        raise SistemaNoAplicable(
+            "El Gradiente Conjugado requiere una matriz simétrica "
+            f"(max |A - Aᵀ| / max |A| = {diagnostico['asimetria']:.2e}); "
+            "usa el modo automático (LU) o SOR", diagnostico)
+    if diagnostico['definida_positiva'] is False:
+        motivo = ("tiene elementos diagonales no positivos" if diagnostico['prueba_definida'] == 'diagonal'
+                  else "la factorización de Cholesky falla")
+        raise SistemaNoAplicable(
+            f"El Gradiente Conjugado requiere una matriz definida positiva: {motivo}; "
+            "usa el modo automático (LU)", diagnostico)
+
+
+def verificar_sor(diagnostico: Dict[str, Any], omega: Any = None) -> Dict[str, Any]:
+    """
+    Lanza SistemaNoAplicable si SOR no puede aplicarse (diagonal con ceros,
+    valores no finitos, ω fuera de (0, 2)). Si no, devuelve si la
+    convergencia está garantizada y por qué criterio.
+    """
+    if not diagnostico['finita']:
+        raise SistemaNoAplicable("La matriz contiene valores no finitos (NaN o infinito)", diagnostico)
+    if diagnostico['ceros_diagonal']:
+        raise SistemaNoAplicable(
+            f"SOR divide por la diagonal y A tiene {diagnostico['ceros_diagonal']} ceros en ella; "
+            "reordena las filas o usa el Gradiente Conjugado en modo automático", diagnostico)
+    fijo = omega not in (None, 'auto')
+    if fijo and not 0 < float(omega) < 2:
+        raise SistemaNoAplicable("SOR diverge para ω fuera del intervalo (0, 2)", diagnostico)
+
+    if diagnostico['definida_positiva']:
+        criterio = 'simétrica definida positiva (0 < ω < 2)'
+    elif diagnostico['dominancia_diagonal'] == 'estricta' and fijo and float(omega) <= 1:
+        criterio = 'dominancia diagonal estricta (0 < ω ≤ 1)'
+    else:
+        criterio = None
+    return {'convergencia_garantizada': criterio is not None, 'criterio_convergencia': criterio}
+
 
 # ============================================================================
 # GRADIENTE CONJUGADO (CG) - Resolución de sistemas lineales Ax = b
 # ============================================================================
 
+def _precondicionador_jacobi(A) -> Callable[[np.ndarray], np.ndarray]:
+    """Precondicionador diagonal: M = D"""
+    d = A.diagonal() if sparse.issparse(A) else np.diag(A).copy()
+    if np.any(d <= 0):
+        raise ValueError("El precondicionador de Jacobi requiere diagonal positiva")
+    return lambda r: _escalar_filas(1 / d, r)
+
+
+def _precondicionador_ssor(A, omega: float = 1.0) -> Callable[[np.ndarray], np.ndarray]:
+    """
+    Precondicionador SSOR simétrico:
+    M = ω/(2 - ω) · (D/ω + L) (D/ω)^-1 (D/ω + U)
+    """
+    if sparse.issparse(A):
+        d = A.diagonal()
+        D_w = sparse.diags(d / omega)
+        inferior = _solver_triangular((sparse.tril(A, -1) + D_w).tocsc(), lower=True)
+        superior = _solver_triangular((sparse.triu(A, 1) + D_w).tocsc(), lower=False)
+    else:
+        d = np.diag(A).copy()
+        D_w = np.diag(d / omega)
+        inferior = _solver_triangular(np.tril(A, -1) + D_w, lower=True)
+        superior = _solver_triangular(np.triu(A, 1) + D_w, lower=False)
+    escala = (2 - omega) / omega
+
+    def aplicar(r: np.ndarray) -> np.ndarray:
+        y = inferior(r)
+        return superior(_escalar_filas(escala * d, y))
+
+    return aplicar
+
+
+def _precondicionador_ichol(A) -> Callable[[np.ndarray], np.ndarray]:
+    """
+    Precondicionador de Cholesky incompleto sin relleno, IC(0): M = L Lᵀ,
+    donde L conserva el patrón de dispersión de la parte inferior de A.
+    """
+    L = sparse.tril(A, format='csc')
+    L.sort_indices()
+    indptr, indices = L.indptr, L.indices
+    data = L.data.copy()
+
+    for k in range(A.shape[0]):
+        s, e = indptr[k], indptr[k + 1]
+        if s == e or indices[s] != k or data[s] <= 0:
+            raise ValueError("Cholesky incompleto falló: pivote no positivo en la fila "
+                             f"{k + 1}")
+        data[s] = np.sqrt(data[s])
+        data[s + 1:e] /= data[s]
+
+        filas = indices[s + 1:e]
+        valores = data[s + 1:e]
+        # Actualización restringida al patrón: A[i, j] -= L[i, k] L[j, k] para i >= j > k
+        for t, j in enumerate(filas):
+            js, je = indptr[j], indptr[j + 1]
+            filas_j = indices[js:je]
+            pos = np.searchsorted(filas_j, filas[t:])
+            validos = pos < len(filas_j)
+            validos[validos] = filas_j[pos[validos]] == filas[t:][validos]
+            data[js + pos[validos]] -= valores[t:][validos] * valores[t]
+
+    L = sparse.csc_matrix((data, indices, indptr), shape=L.shape)
+    inferior = _solver_triangular(L, lower=True)
+    superior = _solver_triangular(L.T.tocsc(), lower=False)
+    return lambda r: superior(inferior(r))
+
+
+PRECONDICIONADORES = {
+    'jacobi': _precondicionador_jacobi,
+    'ssor': _precondicionador_ssor,
+    'ichol': _precondicionador_ichol,
+}
+
+
 def gradiente_conjugado(A: np.ndarray, b: np.ndarray, x0: np.ndarray = None, 
-                       tol: float = 1e-6, max_iter: int = 1000) -> Dict[str, Any]:
+                       tol: float = 1e-6, max_iter: int = 1000,
+                       precondicionador: str = None, historial: str = 'completo',
+                       historial_k: int = 10, progreso: Callable = None,
+                       intervalo_progreso: float = 0.5, tiempo_max: float = None,
+                       cancelacion: Any = None, diagnostico: Dict[str, Any] = None) -> Dict[str, Any]:
     """
     Resuelve el sistema Ax = b usando el método del Gradiente Conjugado.
     
     Args:
-        A: Matriz simétrica positiva definida (n x n)
+        A: Matriz simétrica positiva definida (n x n), densa o dispersa (CSR)
         b: Vector de términos independientes (n)
         x0: Vector inicial (si es None, se usa el vector cero)
         tol: Tolerancia para convergencia
         max_iter: Número máximo de iteraciones
+        precondicionador: None (CG clásico), 'jacobi', 'ssor' o 'ichol'
+                          (Gradiente Conjugado Precondicionado)
+        historial: Política para guardar los iterados en 'historial_x':
+                   'completo', 'ninguno', 'cada_k', 'ultimos_k' o 'muestreado'
+        historial_k: Parámetro k de la política de historial
+        progreso: Callback progreso(iteracion, residuo, tiempo) llamado como
+                  máximo cada intervalo_progreso segundos; si devuelve True
+                  se cancela la resolución ('cancelado' en el resultado)
+        intervalo_progreso: Segundos mínimos entre llamadas a progreso
+        tiempo_max: Presupuesto de tiempo en segundos (None: sin límite)
+        cancelacion: Token de cancelación con is_set() (p. ej. threading.Event)
+        diagnostico: Resultado de diagnosticar_sistema(A), si ya se calculó
     
     Returns:
-        Dict con solución, iteraciones, residuos y error
+        Dict con solución, iteraciones, residuos, error, tiempos de
+        preparación del precondicionador y de iteración y el diagnóstico de
+        A. Si no converge, 'motivo' indica por qué se detuvo ('max_iter',
+        'timeout' o 'cancelado'); al interrumpirse se devuelve el iterado de
+        menor residuo
+    
+    Raises:
+        SistemaNoAplicable: si A no es simétrica definida positiva (antes de
+            iterar o, si el diagnóstico no pudo decidirlo, al encontrar una
+            dirección con pᵀAp ≤ 0)
     """
+    if precondicionador is not None and precondicionador not in PRECONDICIONADORES:
+        raise ValueError(f"Precondicionador desconocido: {precondicionador}")
+    registro = _HistorialIteraciones(historial, historial_k)
+    reportar = _Progreso(progreso, intervalo_progreso, tiempo_max, cancelacion)
+
+    A = _como_matriz_float(A)
+    b = np.asarray(b, dtype=float)
     n = len(b)
     if x0 is None:
         x0 = np.zeros(n)
+    if diagnostico is None:
+        diagnostico = diagnosticar_sistema(A)
+    verificar_cg(diagnostico)
     
-    x = x0.copy()
+    inicio = time.perf_counter()
+    if precondicionador is None:
+        aplicar_M = None
+    else:
+        aplicar_M = PRECONDICIONADORES[precondicionador](A)
+    tiempo_precondicionador = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    x = np.array(x0, dtype=float)
     r = b - A @ x
-    p = r.copy()
-    rs_old = r @ r
+    z = r if aplicar_M is None else aplicar_M(r)
+    p = z.copy()
+    rz_old = r @ z
     
-    iteraciones = []
     residuos = []
+    # El residuo de CG no es monótono: se conserva el mejor iterado
+    mejor_x, mejor_residuo = x, np.linalg.norm(r)
+    if mejor_residuo <= tol or rz_old == 0:
+        # x0 ya es solución (p. ej. arranque en caliente desde el mismo
+        # sistema): con r = 0 el paso sería 0/0
+        return {
+            'solucion': x.tolist(),
+            'iteraciones_totales': 0,
+            'residuos': residuos,
+            'convergencia': True,
+            'error_final': mejor_residuo,
+            'precondicionador': precondicionador,
+            'tiempo_precondicionador': tiempo_precondicionador,
+            'tiempo_iteraciones': time.perf_counter() - inicio,
+            'diagnostico': diagnostico,
+            **registro.exportar(0, x)
+        }
     
     for i in range(max_iter):
         Ap = A @ p
-        alpha = rs_old / (p @ Ap)
+        curvatura = p @ Ap
+        if curvatura <= 0 and np.any(p):
+            raise SistemaNoAplicable(
+                f"La matriz no es definida positiva (pᵀAp ≤ 0 en la iteración {i + 1})", diagnostico)
+        alpha = rz_old / curvatura
         x = x + alpha * p
         r = r - alpha * Ap
-        rs_new = r @ r
         
-        residuo = np.sqrt(rs_new)
+        residuo = np.linalg.norm(r)
         residuos.append(residuo)
-        iteraciones.append(x.copy())
+        registro.agregar(i + 1, x)
+        if residuo < mejor_residuo:
+            mejor_x, mejor_residuo = x, residuo
         
-        if residuo < tol:
+        if residuo <= tol:
             return {
                 'solucion': x.tolist(),
                 'iteraciones_totales': i + 1,
                 'residuos': residuos,
                 'convergencia': True,
                 'error_final': residuo,
-                'historial_x': [iter_x.tolist() for iter_x in iteraciones]
+                'precondicionador': precondicionador,
+                'tiempo_precondicionador': tiempo_precondicionador,
+                'tiempo_iteraciones': time.perf_counter() - inicio,
+                'diagnostico': diagnostico,
+                **registro.exportar(i + 1, x)
             }
         
-        beta = rs_new / rs_old
-        p = r + beta * p
-        rs_old = rs_new
+        if reportar(i + 1, residuo):
+            break
+        
+        z = r if aplicar_M is None else aplicar_M(r)
+        rz_new = r @ z
+        beta = rz_new / rz_old
+        p = z + beta * p
+        rz_old = rz_new
     
+    iteraciones = len(residuos)
+    if reportar.motivo is not None:
+        x, error_final = mejor_x, mejor_residuo
+    else:
+        error_final = np.linalg.norm(r)
     return {
         'solucion': x.tolist(),
-        'iteraciones_totales': max_iter,
+        'iteraciones_totales': iteraciones,
         'residuos': residuos,
         'convergencia': False,
-        'error_final': np.sqrt(rs_old),
-        'historial_x': [iter_x.tolist() for iter_x in iteraciones]
+        **reportar.interrumpido(),
+        'error_final': error_final,
+        'precondicionador': precondicionador,
+        'tiempo_precondicionador': tiempo_precondicionador,
+        'tiempo_iteraciones': time.perf_counter() - inicio,
+        'diagnostico': diagnostico,
+        **registro.exportar(iteraciones, x)
+    }
+
+
+def _productos_columnas(X: np.ndarray, Y: np.ndarray) -> np.ndarray:
+    """Producto punto de cada columna de X con la misma columna de Y"""
+    return np.einsum('ij,ij->j', X, Y)
+
+
+def gradiente_conjugado_bloque(A: np.ndarray, B: np.ndarray, X0: np.ndarray = None,
+                               tol: float = 1e-6, max_iter: int = 1000,
+                               precondicionador: str = None, progreso: Callable = None,
+                               intervalo_progreso: float = 0.5, tiempo_max: float = None,
+                               cancelacion: Any = None, diagnostico: Dict[str, Any] = None) -> Dict[str, Any]:
+    """
+    Resuelve AX = B para varios lados derechos (las columnas de B) a la vez.
+    
+    Cada columna sigue su propia recurrencia de CG, pero el producto A @ P y
+    el precondicionador se aplican a todas las columnas activas juntas, de
+    modo que cada pasada sobre A se comparte. Una columna deja de iterar en
+    cuanto converge.
+    
+    Args:
+        A: Matriz simétrica positiva definida (n x n), densa o dispersa (CSR)
+        B: Matriz de lados derechos (n x m)
+        X0: Aproximación inicial (n x m); si es None, ceros
+        tol, max_iter, precondicionador, progreso, intervalo_progreso,
+        tiempo_max, cancelacion, diagnostico: ver gradiente_conjugado
+            (progreso recibe el mayor residuo activo; al interrumpirse se
+            devuelven los iterados actuales)
+    
+    Returns:
+        Dict con la solución X (n x m) y, en 'columnas', la solución,
+        iteraciones, convergencia, error final y residuos de cada columna.
+        Si se interrumpe ('timeout' o 'cancelado'), las columnas sin
+        converger devuelven su iterado de menor residuo
+    
+    Raises:
+        SistemaNoAplicable: como gradiente_conjugado
+    """
+    if precondicionador is not None and precondicionador not in PRECONDICIONADORES:
+        raise ValueError(f"Precondicionador desconocido: {precondicionador}")
+    reportar = _Progreso(progreso, intervalo_progreso, tiempo_max, cancelacion)
+
+    A = _como_matriz_float(A)
+    B = np.asarray(B, dtype=float)
+    if B.ndim == 1:
+        B = B[:, np.newaxis]
+    n, m = B.shape
+    X = np.zeros((n, m)) if X0 is None else np.array(X0, dtype=float).reshape(n, m)
+    if diagnostico is None:
+        diagnostico = diagnosticar_sistema(A)
+    verificar_cg(diagnostico)
+    
+    inicio = time.perf_counter()
+    aplicar_M = None if precondicionador is None else PRECONDICIONADORES[precondicionador](A)
+    tiempo_precondicionador = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    R = B - A @ X
+    Z = R if aplicar_M is None else aplicar_M(R)
+    P = Z.copy()
+    rz = _productos_columnas(R, Z)
+    
+    # X_a, R, P y rz contienen solo las columnas activas; se compactan cuando
+    # alguna converge (y no en cada iteración)
+    activos = np.arange(m)
+    X_a = X
+    iteraciones = np.zeros(m, dtype=int)
+    convergencia = np.zeros(m, dtype=bool)
+    errores = np.linalg.norm(R, axis=0)
+    residuos = [[] for _ in range(m)]
+    # Mejor iterado de cada columna, por si se interrumpe (ver gradiente_conjugado)
+    X_mejor = X.copy()
+    mejores_errores = errores.copy()
+    # Las columnas que ya parten de la solución no iteran (su paso sería 0/0)
+    resueltas = (errores <= tol) | (rz == 0)
+    if resueltas.any():
+        convergencia[resueltas] = True
+        seguir = ~resueltas
+        activos, X_a, R, P, rz = activos[seguir], X_a[:, seguir], R[:, seguir], P[:, seguir], rz[seguir]
+    
+    for k in range(max_iter if activos.size else 0):
+        AP = A @ P
+        curvaturas = _productos_columnas(P, AP)
+        if np.any((curvaturas <= 0) & P.any(axis=0)):
+            raise SistemaNoAplicable(
+                f"La matriz no es definida positiva (pᵀAp ≤ 0 en la iteración {k + 1})", diagnostico)
+        alpha = rz / curvaturas
+        X_a += alpha * P
+        R -= alpha * AP
+        
+        normas = np.linalg.norm(R, axis=0)
+        for j, norma in zip(activos, normas):
+            residuos[j].append(norma)
+        iteraciones[activos] = k + 1
+        errores[activos] = normas
+        mejoran = normas < mejores_errores[activos]
+        if mejoran.any():
+            X_mejor[:, activos[mejoran]] = X_a[:, mejoran]
+            mejores_errores[activos[mejoran]] = normas[mejoran]
+        convergidas = normas <= tol
+        if convergidas.any():
+            convergencia[activos[convergidas]] = True
+            X[:, activos[convergidas]] = X_a[:, convergidas]
+            seguir = ~convergidas
+            activos, X_a, R, P, rz = activos[seguir], X_a[:, seguir], R[:, seguir], P[:, seguir], rz[seguir]
+        if activos.size == 0 or reportar(k + 1, normas.max()):
+            break
+        
+        Z = R if aplicar_M is None else aplicar_M(R)
+        rz_nuevo = _productos_columnas(R, Z)
+        P = Z + (rz_nuevo / rz) * P
+        rz = rz_nuevo
+    if reportar.motivo is not None:
+        X[:, activos] = X_mejor[:, activos]
+        errores[activos] = mejores_errores[activos]
+    else:
+        X[:, activos] = X_a
+    
+    return {
+        'solucion': X.tolist(),
+        'columnas': [{
+            'solucion': X[:, j].tolist(),
+            'iteraciones': int(iteraciones[j]),
+            'convergencia': bool(convergencia[j]),
+            'error_final': float(errores[j]),
+            'residuos': residuos[j]
+        } for j in range(m)],
+        'num_columnas': m,
+        'iteraciones_totales': int(iteraciones.max()) if m else 0,
+        'convergencia': bool(convergencia.all()),
+        'cancelado': reportar.cancelado,
+        'motivo': reportar.motivo or (None if convergencia.all() else 'max_iter'),
+        'error_final': float(errores.max()) if m else 0.0,
+        'precondicionador': precondicionador,
+        'tiempo_precondicionador': tiempo_precondicionador,
+        'tiempo_iteraciones': time.perf_counter() - inicio,
+        'diagnostico': diagnostico
+    }
+
+
+# ============================================================================
+# MODO AUTOMÁTICO - Factorización directa con caché
+# ============================================================================
+
+# Órdenes hasta los que el modo automático factoriza en lugar de iterar
+MAX_N_DIRECTO_DENSO = 3000
+MAX_N_DIRECTO_DISPERSO = 200_000
+
+# Factorizaciones ya calculadas, indexadas por la huella de la matriz (por
+# proceso de trabajo): con la misma A y otro b solo se hacen las
+# sustituciones triangulares
+MAX_BYTES_CACHE_FACTORIZACIONES = 256 * 1024 * 1024
+_cache_factorizaciones = CacheLRU(MAX_BYTES_CACHE_FACTORIZACIONES)
+
+
+def _huella_matriz(A) -> str:
+    """Huella del contenido de A; las dispersas se llevan antes a CSR canónica"""
+    if sparse.issparse(A):
+        if A.format != 'csr' or not A.has_canonical_format:
+            # Se canoniza una copia: la huella no modifica la matriz del llamador
+            A = A.tocsr(copy=True)
+            A.sum_duplicates()
+        return huella('csr', A.shape, A.indptr, A.indices, A.data)
+    return huella('densa', A)
+
+
+def _factorizar(A) -> Tuple[Dict[str, Any], int]:
+    """
+    Factoriza A y devuelve (factorización, bytes). La factorización contiene
+    'tipo' ('cholesky' o 'lu') y 'resolver', que acepta un vector o una
+    matriz de lados derechos.
+
+    Las matrices densas simétricas se intentan con Cholesky y, si no son
+    definidas positivas, se factorizan con LU. Las dispersas usan SuperLU;
+    si son simétricas se ordenan sobre el patrón de A + Aᵀ y se prefiere
+    pivotear en la diagonal.
+    """
+    n = A.shape[0]
+    if sparse.issparse(A):
+        from scipy.sparse.linalg import splu
+        simetrica = _es_simetrica(A)
+        try:
+            lu = splu(sparse.csc_matrix(A),
+                      permc_spec='MMD_AT_PLUS_A' if simetrica else 'COLAMD',
+                      diag_pivot_thresh=0.01 if simetrica else 1.0)
+        except RuntimeError as e:
+            raise ValueError(f"La matriz es singular ({e})")
+        # Valores e índices de L y U, más las permutaciones
+        return {'tipo': 'lu', 'resolver': lu.solve}, lu.nnz * 12 + n * 8
+
+    from scipy.linalg import cho_factor, cho_solve, lu_factor, lu_solve, LinAlgError, LinAlgWarning
+    if _es_simetrica(A):
+        try:
+            c = cho_factor(A, lower=True, check_finite=False)
+            return {'tipo': 'cholesky', 'resolver': lambda B: cho_solve(c, B, check_finite=False)}, c[0].nbytes
+        except LinAlgError:
+            pass  # Simétrica pero no definida positiva
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', LinAlgWarning)
+        lu, piv = lu_factor(A, check_finite=False)
+    if not np.all(np.diag(lu)):
+        raise ValueError("La matriz es singular")
+    return {'tipo': 'lu', 'resolver': lambda B: lu_solve((lu, piv), B, check_finite=False)}, lu.nbytes + piv.nbytes
+
+
+def gradiente_conjugado_auto(A: np.ndarray, b: np.ndarray, x0: np.ndarray = None,
+                             tol: float = 1e-6, max_iter: int = 1000,
+                             precondicionador: str = None, historial: str = 'completo',
+                             historial_k: int = 10, progreso: Callable = None,
+                             intervalo_progreso: float = 0.5, tiempo_max: float = None,
+                             cancelacion: Any = None) -> Dict[str, Any]:
+    """
+    Modo automático: resuelve Ax = b por factorización directa si el sistema
+    es suficientemente pequeño y, si no, con el Gradiente Conjugado. Por
+    encima del límite, las matrices dispersas que no son simétricas
+    definidas positivas se factorizan igualmente con LU dispersa y las
+    densas se rechazan con SistemaNoAplicable.
+    
+    La factorización (Cholesky si A es simétrica definida positiva, LU en
+    otro caso) se guarda en una caché LRU indexada por la huella de A, de
+    modo que las resoluciones siguientes con la misma matriz y otros lados
+    derechos omiten la factorización.
+    
+    Args:
+        A: Matriz cuadrada (n x n), densa o dispersa (CSR)
+        b: Vector (n) o matriz n x m de lados derechos
+        x0, tol, max_iter, precondicionador, historial, historial_k,
+        progreso, intervalo_progreso, tiempo_max, cancelacion: como en
+            gradiente_conjugado; solo se usan si se resuelve iterando (x0 es
+            X0 con varios lados derechos)
+    
+    Returns:
+        Dict con las claves de gradiente_conjugado (o de
+        gradiente_conjugado_bloque si b es una matriz) más 'metodo'
+        ('cholesky', 'lu' o 'cg'); las soluciones directas incluyen además
+        'factorizacion_reutilizada' y los tiempos de factorización y
+        solución, y su 'error_final' es el residuo relativo ‖b - Ax‖ / ‖b‖
+    """
+    A = _como_matriz_float(A)
+    b = np.asarray(b, dtype=float)
+    limite = MAX_N_DIRECTO_DISPERSO if sparse.issparse(A) else MAX_N_DIRECTO_DENSO
+    
+    if A.shape[0] > limite:
+        # Solo se itera si CG es aplicable; las dispersas que no lo admiten se
+        # factorizan con LU dispersa aunque superen el límite
+        diagnostico = diagnosticar_sistema(A)
+        if not diagnostico['finita']:
+            raise SistemaNoAplicable("La matriz contiene valores no finitos (NaN o infinito)", diagnostico)
+        if diagnostico['simetrica'] and diagnostico['definida_positiva'] is not False:
+            try:
+                if b.ndim == 2:
+                    resultado = gradiente_conjugado_bloque(A, b, X0=x0, tol=tol, max_iter=max_iter,
+                                                           precondicionador=precondicionador, progreso=progreso,
+                                                           intervalo_progreso=intervalo_progreso,
+                                                           tiempo_max=tiempo_max, cancelacion=cancelacion,
+                                                           diagnostico=diagnostico)
+                else:
+                    resultado = gradiente_conjugado(A, b, x0=x0, tol=tol, max_iter=max_iter,
+                                                    precondicionador=precondicionador, historial=historial,
+                                                    historial_k=historial_k, progreso=progreso,
+                                                    intervalo_progreso=intervalo_progreso,
+                                                    tiempo_max=tiempo_max, cancelacion=cancelacion,
+                                                    diagnostico=diagnostico)
+                resultado['metodo'] = 'cg'
+                return resultado
+            except SistemaNoAplicable:
+                # pᵀAp ≤ 0: simétrica pero indefinida
+                diagnostico['definida_positiva'] = False
+        if not sparse.issparse(A):
+            motivo = ("no es simétrica" if not diagnostico['simetrica']
+                      else "no es definida positiva")
+            raise SistemaNoAplicable(
+                f"Las matrices densas de orden mayor que {MAX_N_DIRECTO_DENSO} se resuelven con el "
+                f"Gradiente Conjugado y esta {motivo}; envíala en formato disperso para "
+                "factorizarla con LU o usa SOR", diagnostico)
+    
+    clave = _huella_matriz(A)
+    reutilizada = clave in _cache_factorizaciones
+    inicio = time.perf_counter()
+    factorizacion = _cache_factorizaciones.obtener(clave, lambda: _factorizar(A))
+    tiempo_factorizacion = time.perf_counter() - inicio
+    
+    inicio = time.perf_counter()
+    x = factorizacion['resolver'](b)
+    tiempo_solucion = time.perf_counter() - inicio
+    if not np.all(np.isfinite(x)):
+        raise ValueError("La matriz es singular o está muy mal condicionada")
+    # Norma del residuo de cada lado derecho y residuo relativo ‖b - Ax‖ / ‖b‖,
+    # que es el que se compara con tol (la escala de b no cambia el veredicto)
+    residuos = np.linalg.norm(b - A @ x, axis=0)
+    normas_b = np.linalg.norm(b, axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        relativos = np.where(normas_b > 0, residuos / normas_b, residuos)
+    
+    comunes = {
+        'metodo': factorizacion['tipo'],
+        'factorizacion_reutilizada': reutilizada,
+        'iteraciones_totales': 0,
+        'cancelado': False,
+        'precondicionador': None,
+        'tiempo_factorizacion': tiempo_factorizacion,
+        'tiempo_solucion': tiempo_solucion
+    }
+    if b.ndim == 2:
+        return {
+            'solucion': x.tolist(),
+            'columnas': [{
+                'solucion': x[:, j].tolist(),
+                'iteraciones': 0,
+                'convergencia': bool(relativos[j] < tol),
+                'error_final': float(relativos[j]),
+                'residuos': [float(residuos[j])]
+            } for j in range(b.shape[1])],
+            'num_columnas': b.shape[1],
+            'convergencia': bool(np.all(relativos < tol)),
+            'error_final': float(relativos.max()) if b.shape[1] else 0.0,
+            **comunes
+        }
+    return {
+        'solucion': x.tolist(),
+        'residuos': [float(residuos)],
+        'convergencia': bool(relativos < tol),
+        'error_final': float(relativos),
+        **comunes
     }
 
 
@@ -75,44 +855,288 @@ def gradiente_conjugado(A: np.ndarray, b: np.ndarray, x0: np.ndarray = None,
 # SOR (Successive Over-Relaxation) - Resolución de sistemas lineales
 # ============================================================================
 
-def sor(A: np.ndarray, b: np.ndarray, omega: float = 1.5, x0: np.ndarray = None,
-        tol: float = 1e-6, max_iter: int = 1000) -> Dict[str, Any]:
+def _barrido_sor_referencia(A: np.ndarray, b: np.ndarray,
+                            omega: float) -> Callable[[np.ndarray], np.ndarray]:
+    """
+    Barrido SOR elemento a elemento (implementación original).
+
+    Se conserva como modo de referencia para validar el motor vectorizado.
+    """
+    if sparse.issparse(A):
+        A = A.toarray()
+    n = len(b)
+
+    def barrido(x: np.ndarray) -> np.ndarray:
+        x = x.copy()
+        for i in range(n):
+            suma = 0.0
+            for j in range(n):
+                if j != i:
+                    suma += A[i, j] * x[j]
+
+            x[i] = (1 - omega) * x[i] + (omega / A[i, i]) * (b[i] - suma)
+        return x
+
+    return barrido
+
+
+def _barrido_sor_vectorizado(A: np.ndarray, b: np.ndarray,
+                             omega: float) -> Callable[[np.ndarray], np.ndarray]:
+    """
+    Barrido SOR con operaciones vectorizadas.
+
+    Separa una sola vez A = D + L + U y resuelve en cada barrido el sistema
+    triangular (D + ωL) x_nuevo = ωb - (ωU + (ω - 1)D) x, que es exactamente
+    la actualización de Gauss-Seidel relajada del bucle de referencia.
+
+    Si A es dispersa, el sistema triangular se factoriza una sola vez (ver
+    _solver_triangular), y cada barrido cuesta O(nnz).
+
+    b puede ser una matriz (n x m) de lados derechos; en ese caso barrido
+    recibe las columnas activas de X y sus índices.
+    """
+    if sparse.issparse(A):
+        d = A.diagonal()
+        U = sparse.triu(A, 1, format='csr')
+        M = (sparse.tril(A, -1) * omega + sparse.diags(d)).tocsc()
+    else:
+        d = np.diag(A).copy()
+        U = np.triu(A, 1)
+        M = np.tril(A, -1) * omega
+        M[np.diag_indices_from(M)] = d
+    resolver = _solver_triangular(M, lower=True)
+    c = omega * b
+
+    def barrido(x: np.ndarray, columnas: np.ndarray = None) -> np.ndarray:
+        c_x = c if columnas is None else c[:, columnas]
+        rhs = c_x - omega * (U @ x) + _escalar_filas((1 - omega) * d, x)
+        return resolver(rhs)
+
+    return barrido
+
+
+MODOS_SOR = {
+    'vectorizado': _barrido_sor_vectorizado,
+    'referencia': _barrido_sor_referencia,
+}
+
+
+def _radio_espectral_jacobi(A, max_pasos: int = 100, tol: float = 1e-4) -> float:
+    """
+    Estima ρ(J), el radio espectral de la matriz de iteración de Jacobi
+    J = I - D⁻¹A.
+
+    Si A es simétrica con diagonal positiva, J es semejante a la matriz
+    simétrica I - D^-½ A D^-½ y bastan unos pasos de Lanczos (eigsh). En otro
+    caso se aplica el método de la potencia sobre J²: en las matrices
+    consistentemente ordenadas los autovalores de J aparecen en pares ±μ y la
+    potencia sobre J sola oscilaría.
+    """
+    d = A.diagonal() if sparse.issparse(A) else np.diag(A)
+    if np.any(d == 0):
+        raise ValueError("El ω automático requiere una diagonal sin ceros")
+    n = A.shape[0]
+
+    if n > 2 and np.all(d > 0) and _es_simetrica(A):
+        from scipy.sparse.linalg import LinearOperator, eigsh, ArpackNoConvergence
+        s = 1 / np.sqrt(d)
+        S = LinearOperator((n, n), dtype=float,
+                           matvec=lambda v: v.ravel() - s * (A @ (s * v.ravel())))
+        try:
+            return float(abs(eigsh(S, k=1, which='LM', tol=tol, ncv=min(n, 20),
+                                   maxiter=max_pasos, return_eigenvectors=False)[0]))
+        except ArpackNoConvergence as e:
+            if len(e.eigenvalues):
+                return float(abs(e.eigenvalues[0]))
+
+    x = np.random.default_rng(0).standard_normal(n)
+    x /= np.linalg.norm(x)
+    rho = 0.0
+    for _ in range(max_pasos):
+        y = x - (A @ x) / d
+        y = y - (A @ y) / d
+        norma = np.linalg.norm(y)
+        if norma == 0:
+            return 0.0
+        anterior, rho = rho, np.sqrt(norma)
+        x = y / norma
+        if abs(rho - anterior) <= tol * rho:
+            break
+    return float(rho)
+
+
+def _omega_optimo(rho: float) -> float:
+    """ω óptimo de Young para matrices consistentemente ordenadas"""
+    if rho >= 1:
+        return 1.0  # Jacobi no converge: se parte de Gauss-Seidel
+    return float(2 / (1 + np.sqrt(1 - rho ** 2)))
+
+
+class _AjusteOmega:
+    """
+    Reajuste adaptativo de ω durante la iteración (estrategia de Hageman y
+    Young).
+
+    Cada 'ventana' iteraciones estima el factor de reducción del error λ. Si
+    la convergencia es claramente más lenta que la esperada para el ω actual
+    (λ > (ω - 1)^F), el radio espectral de Jacobi estaba subestimado: la
+    relación de Young (λ + ω - 1)² = λ ω² μ², válida para ω ≤ ω_opt, da una
+    mejor estimación de μ y con ella un nuevo ω. Si el error crece durante
+    dos ventanas seguidas, ω se acerca a 1 y el valor descartado queda como
+    tope.
+
+    Cerca de ω_opt el error decae como k (ω - 1)^k, de modo que λ solo cae
+    por debajo de (ω - 1)^F tras unas 1 / ((1 - F) |ln(ω - 1)|) iteraciones;
+    tras cada cambio se espera el triple antes de volver a medir.
+    """
+    F = 0.75
+
+    def __init__(self, omega: float, ventana: int = 10):
+        self.omega = omega
+        self.ventana = ventana
+        self.ajustes = []
+        self._inicio = None  # (iteración, error) al comenzar la ventana
+        self._omega_max = 1.99
+        self._crecimientos = 0
+        self._desde = self._transitorio()
+
+    def _transitorio(self) -> int:
+        """Iteraciones a esperar tras fijar ω antes de medir λ"""
+        if self.omega <= 1:
+            return 2 * self.ventana
+        return max(2 * self.ventana, int(3 / ((1 - self.F) * -np.log(self.omega - 1))))
+
+    def _cambiar(self, iteracion: int, omega: float) -> bool:
+        self.omega = omega
+        self.ajustes.append({'iteracion': iteracion, 'omega': omega})
+        self._inicio = None
+        self._desde = iteracion + self._transitorio()
+        return True
+
+    def observar(self, iteracion: int, error: float) -> bool:
+        """Registra el error de la iteración; devuelve True si ω cambió"""
+        if iteracion < self._desde:
+            return False
+        if self._inicio is None or self._inicio[1] == 0:
+            self._inicio = (iteracion, error)
+            return False
+        k0, e0 = self._inicio
+        if iteracion - k0 < self.ventana:
+            return False
+        self._inicio = (iteracion, error)
+        lam = (error / e0) ** (1 / (iteracion - k0))
+
+        if lam >= 1:
+            self._crecimientos += 1
+            if self._crecimientos < 2 or self.omega <= 1:
+                return False
+            self._crecimientos = 0
+            self._omega_max = self.omega
+            return self._cambiar(iteracion, 1 + (self.omega - 1) / 2)
+
+        self._crecimientos = 0
+        if lam <= max(self.omega - 1, 0) ** self.F:
+            return False
+        mu2 = (lam + self.omega - 1) ** 2 / (lam * self.omega ** 2)
+        nuevo = _omega_optimo(np.sqrt(min(mu2, 1.0)))
+        if nuevo >= self._omega_max:
+            nuevo = (self.omega + self._omega_max) / 2
+        if nuevo <= self.omega + 1e-3:
+            return False
+        return self._cambiar(iteracion, nuevo)
+
+
+def _omega_inicial(A, omega) -> Tuple[float, Dict[str, Any], Any]:
+    """
+    Resuelve el parámetro omega de sor/sor_bloque: devuelve (ω, datos de la
+    estimación para el resultado, ajuste adaptativo o None).
+    """
+    if omega != 'auto':
+        return float(omega), {}, None
+    radio = _radio_espectral_jacobi(A)
+    omega = _omega_optimo(radio)
+    return omega, {'radio_espectral_jacobi': radio, 'omega_inicial': omega}, _AjusteOmega(omega)
+
+
+def _info_omega(estimacion: Dict[str, Any], ajuste) -> Dict[str, Any]:
+    """Claves del ω automático para el dict de resultados"""
+    if ajuste is None:
+        return {}
+    return {'omega_automatico': True, **estimacion, 'ajustes_omega': ajuste.ajustes}
+
+
+def sor(A: np.ndarray, b: np.ndarray, omega: Any = 1.5, x0: np.ndarray = None,
+        tol: float = 1e-6, max_iter: int = 1000,
+        modo: str = 'vectorizado', historial: str = 'completo',
+        historial_k: int = 10, progreso: Callable = None,
+        intervalo_progreso: float = 0.5, tiempo_max: float = None,
+        cancelacion: Any = None, diagnostico: Dict[str, Any] = None) -> Dict[str, Any]:
     """
     Resuelve el sistema Ax = b usando el método SOR.
     
     Args:
-        A: Matriz de coeficientes (n x n)
+        A: Matriz de coeficientes (n x n), densa o dispersa (CSR)
         b: Vector de términos independientes (n)
-        omega: Factor de relajación (1 < omega < 2 típicamente)
+        omega: Factor de relajación (1 < omega < 2 típicamente) o 'auto':
+               ω óptimo estimado a partir del radio espectral de Jacobi y
+               reajustado durante la iteración según la reducción del error
         x0: Vector inicial (si es None, se usa el vector cero)
         tol: Tolerancia para convergencia
         max_iter: Número máximo de iteraciones
+        modo: 'vectorizado' (sustitución triangular por barrido) o
+              'referencia' (bucle elemento a elemento, para validación)
+        historial: Política para guardar los iterados en 'historial_x'
+                   (ver gradiente_conjugado)
+        historial_k: Parámetro k de la política de historial
+        progreso: Callback progreso(iteracion, error, tiempo); ver
+                  gradiente_conjugado
+        intervalo_progreso: Segundos mínimos entre llamadas a progreso
+        tiempo_max, cancelacion: Presupuesto de tiempo y token de
+                  cancelación; ver gradiente_conjugado
+        diagnostico: Resultado de diagnosticar_sistema(A), si ya se calculó
     
     Returns:
-        Dict con solución, iteraciones, errores y omega usado
+        Dict con solución, iteraciones, errores y omega usado (el final, con
+        omega='auto'; además 'radio_espectral_jacobi', 'omega_inicial' y
+        'ajustes_omega'). Si no converge, 'motivo' indica por qué se detuvo
+        ('max_iter', 'timeout' o 'cancelado'); con 'max_iter' la solución es
+        el último iterado y al interrumpirse, el de menor error. 'diagnostico'
+        incluye si la convergencia está garantizada (ver verificar_sor)
+    
+    Raises:
+        SistemaNoAplicable: si A tiene ceros en la diagonal o ω ∉ (0, 2)
     """
+    if modo not in MODOS_SOR:
+        raise ValueError(f"Modo SOR desconocido: {modo}")
+    registro = _HistorialIteraciones(historial, historial_k)
+    reportar = _Progreso(progreso, intervalo_progreso, tiempo_max, cancelacion)
+
+    A = _como_matriz_float(A)
+    b = np.asarray(b, dtype=float)
     n = len(b)
     if x0 is None:
         x0 = np.zeros(n)
+    if diagnostico is None:
+        diagnostico = diagnosticar_sistema(A)
+    diagnostico = {**diagnostico, **verificar_sor(diagnostico, omega)}
     
-    x = x0.copy()
-    iteraciones = []
+    x = np.array(x0, dtype=float)
+    omega, estimacion, ajuste = _omega_inicial(A, omega)
+    barrido = MODOS_SOR[modo](A, b, omega)
     errores = []
+    # Con ω grande el error puede crecer antes de bajar: se conserva el
+    # iterado de menor error por si la resolución se interrumpe
+    mejor_x, mejor_error = x, None
     
     for k in range(max_iter):
-        x_old = x.copy()
-        
-        for i in range(n):
-            suma = 0.0
-            for j in range(n):
-                if j != i:
-                    suma += A[i, j] * x[j]
-            
-            x[i] = (1 - omega) * x[i] + (omega / A[i, i]) * (b[i] - suma)
+        x_old = x
+        x = barrido(x_old)
         
         error = np.linalg.norm(x - x_old, ord=np.inf)
         errores.append(error)
-        iteraciones.append(x.copy())
+        registro.agregar(k + 1, x)
+        if mejor_error is None or error < mejor_error:
+            mejor_x, mejor_error = x, error
         
         if error < tol:
             return {
@@ -122,17 +1146,268 @@ def sor(A: np.ndarray, b: np.ndarray, omega: float = 1.5, x0: np.ndarray = None,
                 'convergencia': True,
                 'error_final': error,
                 'omega': omega,
-                'historial_x': [iter_x.tolist() for iter_x in iteraciones]
+                **_info_omega(estimacion, ajuste),
+                'diagnostico': diagnostico,
+                **registro.exportar(k + 1, x)
             }
+        
+        if reportar(k + 1, error):
+            break
+        
+        if ajuste is not None and ajuste.observar(k + 1, error):
+            omega = ajuste.omega
+            barrido = MODOS_SOR[modo](A, b, omega)
     
+    iteraciones = len(errores)
+    if reportar.motivo is not None:
+        x, error_final = mejor_x, mejor_error
+    else:
+        error_final = errores[-1] if errores else None
     return {
         'solucion': x.tolist(),
-        'iteraciones_totales': max_iter,
+        'iteraciones_totales': iteraciones,
         'errores': errores,
         'convergencia': False,
-        'error_final': errores[-1] if errores else None,
+        **reportar.interrumpido(),
+        'error_final': error_final,
+        'omega': omega,
+        **_info_omega(estimacion, ajuste),
+        'diagnostico': diagnostico,
+        **registro.exportar(iteraciones, x)
+    }
+
+
+def sor_bloque(A: np.ndarray, B: np.ndarray, omega: Any = 1.5, X0: np.ndarray = None,
+               tol: float = 1e-6, max_iter: int = 1000, progreso: Callable = None,
+               intervalo_progreso: float = 0.5, tiempo_max: float = None,
+               cancelacion: Any = None, diagnostico: Dict[str, Any] = None) -> Dict[str, Any]:
+    """
+    Resuelve AX = B con SOR para varios lados derechos (las columnas de B).
+    
+    Cada barrido resuelve el sistema triangular de todas las columnas activas
+    a la vez (una sola pasada sobre A por iteración). Una columna deja de
+    iterar en cuanto converge.
+    
+    Args:
+        A: Matriz de coeficientes (n x n), densa o dispersa (CSR)
+        B: Matriz de lados derechos (n x m)
+        omega: Factor de relajación o 'auto' (ver sor; el reajuste sigue al
+               mayor error activo)
+        X0: Aproximación inicial (n x m); si es None, ceros
+        tol, max_iter, progreso, intervalo_progreso, tiempo_max,
+        cancelacion, diagnostico: ver sor (progreso recibe el mayor error
+            activo)
+    
+    Returns:
+        Dict con la solución X (n x m) y, en 'columnas', la solución,
+        iteraciones, convergencia, error final y errores de cada columna.
+        Si se interrumpe ('timeout' o 'cancelado'), las columnas sin
+        converger devuelven su iterado de menor error
+    """
+    reportar = _Progreso(progreso, intervalo_progreso, tiempo_max, cancelacion)
+
+    A = _como_matriz_float(A)
+    B = np.asarray(B, dtype=float)
+    if B.ndim == 1:
+        B = B[:, np.newaxis]
+    n, m = B.shape
+    X = np.zeros((n, m)) if X0 is None else np.array(X0, dtype=float).reshape(n, m)
+    if diagnostico is None:
+        diagnostico = diagnosticar_sistema(A)
+    diagnostico = {**diagnostico, **verificar_sor(diagnostico, omega)}
+    
+    omega, estimacion, ajuste = _omega_inicial(A, omega)
+    barrido = _barrido_sor_vectorizado(A, B, omega)
+    # X_a contiene solo las columnas activas (ver gradiente_conjugado_bloque)
+    activos = np.arange(m)
+    X_a = X
+    iteraciones = np.zeros(m, dtype=int)
+    convergencia = np.zeros(m, dtype=bool)
+    errores_finales = np.full(m, np.nan)
+    errores = [[] for _ in range(m)]
+    # Iterado de menor error de cada columna, por si se interrumpe (ver sor)
+    X_mejor = X.copy()
+    mejores_errores = np.full(m, np.inf)
+    
+    for k in range(max_iter):
+        X_anterior = X_a
+        X_a = barrido(X_anterior, activos)
+        
+        cambios = np.abs(X_a - X_anterior).max(axis=0) if n else np.zeros(activos.size)
+        for j, cambio in zip(activos, cambios):
+            errores[j].append(cambio)
+        iteraciones[activos] = k + 1
+        errores_finales[activos] = cambios
+        mejoran = cambios < mejores_errores[activos]
+        if mejoran.any():
+            X_mejor[:, activos[mejoran]] = X_a[:, mejoran]
+            mejores_errores[activos[mejoran]] = cambios[mejoran]
+        convergidas = cambios < tol
+        if convergidas.any():
+            convergencia[activos[convergidas]] = True
+            X[:, activos[convergidas]] = X_a[:, convergidas]
+            activos, X_a = activos[~convergidas], X_a[:, ~convergidas]
+        if activos.size == 0 or reportar(k + 1, cambios.max()):
+            break
+        if ajuste is not None and ajuste.observar(k + 1, cambios.max()):
+            omega = ajuste.omega
+            barrido = _barrido_sor_vectorizado(A, B, omega)
+    if reportar.motivo is not None:
+        X[:, activos] = X_mejor[:, activos]
+        errores_finales[activos] = mejores_errores[activos]
+    else:
+        X[:, activos] = X_a
+    
+    return {
+        'solucion': X.tolist(),
+        'columnas': [{
+            'solucion': X[:, j].tolist(),
+            'iteraciones': int(iteraciones[j]),
+            'convergencia': bool(convergencia[j]),
+            'error_final': None if np.isnan(errores_finales[j]) else float(errores_finales[j]),
+            'errores': errores[j]
+        } for j in range(m)],
+        'num_columnas': m,
+        'iteraciones_totales': int(iteraciones.max()) if m else 0,
+        'convergencia': bool(convergencia.all()),
+        'cancelado': reportar.cancelado,
+        'motivo': reportar.motivo or (None if convergencia.all() else 'max_iter'),
+        'error_final': float(np.nanmax(errores_finales)) if m and max_iter > 0 else None,
         'omega': omega,
-        'historial_x': [iter_x.tolist() for iter_x in iteraciones]
+        **_info_omega(estimacion, ajuste),
+        'diagnostico': diagnostico
+    }
+
+
+# Valores de ω que admite un barrido
+MAX_PASOS_BARRIDO = 100
+
+
+def _sor_resumen(A, b, tol: float, max_iter: int, diagnostico: Dict[str, Any],
+                 limite: float, omega: float) -> Dict[str, Any]:
+    """
+    Una resolución del barrido de ω: solo iteraciones, convergencia, error y
+    tiempo. limite es la hora (time.time()) en que se agota el presupuesto
+    común del barrido; se usa el reloj de pared porque la resolución puede
+    ejecutarse en otro proceso.
+    """
+    inicio = time.perf_counter()
+    tiempo_max = None if limite is None else limite - time.time()
+    if tiempo_max is not None and tiempo_max <= 0:
+        # Sin presupuesto: ni siquiera se empieza
+        return {'omega': omega, 'iteraciones': 0, 'convergencia': False,
+                'error_final': None, 'motivo': 'timeout', 'tiempo': 0.0}
+    with np.errstate(over='ignore', invalid='ignore'):
+        resultado = sor(A, b, omega=omega, tol=tol, max_iter=max_iter, historial='ninguno',
+                        diagnostico=diagnostico, tiempo_max=tiempo_max)
+    error = resultado['error_final']
+    return {
+        'omega': omega,
+        'iteraciones': resultado['iteraciones_totales'],
+        'convergencia': resultado['convergencia'],
+        # Las resoluciones que divergen terminan en inf o nan
+        'error_final': float(error) if error is not None and np.isfinite(error) else None,
+        'motivo': resultado.get('motivo'),
+        'tiempo': time.perf_counter() - inicio
+    }
+
+
+def sor_barrido_omega(A: np.ndarray, b: np.ndarray, omega_min: float = 1.0,
+                      omega_max: float = 1.95, pasos: int = 20, tol: float = 1e-6,
+                      max_iter: int = 1000, mapear: Callable = map,
+                      progreso: Callable = None, intervalo_progreso: float = 0.5,
+                      tiempo_max: float = None, cancelacion: Any = None,
+                      diagnostico: Dict[str, Any] = None) -> Dict[str, Any]:
+    """
+    Resuelve el mismo sistema con SOR para varios ω equiespaciados en
+    [omega_min, omega_max] y compara las iteraciones hasta la convergencia.
+    
+    Args:
+        A: Matriz de coeficientes (n x n), densa o dispersa (CSR)
+        b: Vector de términos independientes (n)
+        omega_min, omega_max: Extremos del rango de ω (0 < ω < 2)
+        pasos: Número de valores de ω
+        tol, max_iter: Como en sor, para cada resolución
+        mapear: Función con la interfaz de map() que reparte las
+                resoluciones (por ejemplo, utils.trabajos.mapear_en_paralelo,
+                que devuelve un generador); por defecto se resuelven en serie.
+                La cancelación se atiende al terminar cada ω: las
+                resoluciones ya en curso siguen hasta su fin (o hasta agotar
+                tiempo_max), las pendientes se descartan
+        progreso: Callback opcional progreso(puntos resueltos, iteraciones
+                  del último ω, tiempo); si devuelve True se cancela el
+                  barrido
+        intervalo_progreso: Segundos mínimos entre llamadas a progreso
+        tiempo_max: Presupuesto total en segundos, compartido por todas las
+                    resoluciones; los ω que se quedan sin tiempo figuran con
+                    motivo 'timeout'
+        cancelacion: Token opcional con is_set() (p. ej. threading.Event);
+                     se consulta entre resoluciones
+        diagnostico: Resultado de diagnosticar_sistema(A), si ya se calculó
+    
+    Returns:
+        Dict con 'puntos' (omega, iteraciones, convergencia, error_final,
+        motivo y tiempo de cada resolución), el mejor ω (el que converge en
+        menos iteraciones), el ω teórico de Young para comparar y el
+        diagnóstico de A (se lanza SistemaNoAplicable si SOR no puede
+        aplicarse). Si el barrido se interrumpe, 'motivo' es 'timeout' o
+        'cancelado' y solo se incluyen los ω resueltos hasta entonces.
+    """
+    if not 0 < omega_min <= omega_max < 2:
+        raise ValueError("El rango de ω debe cumplir 0 < ω mínimo ≤ ω máximo < 2")
+    if not 1 <= pasos <= MAX_PASOS_BARRIDO:
+        raise ValueError(f"El barrido admite entre 1 y {MAX_PASOS_BARRIDO} valores de ω")
+    
+    A = _como_matriz_float(A)
+    b = np.asarray(b, dtype=float)
+    omegas = np.linspace(omega_min, omega_max, pasos).tolist()
+    # Se diagnostica una sola vez, antes de repartir las resoluciones
+    if diagnostico is None:
+        diagnostico = diagnosticar_sistema(A)
+    verificar_sor(diagnostico)
+    
+    reportar = _Progreso(progreso, intervalo_progreso, tiempo_max, cancelacion)
+    limite = None if tiempo_max is None else time.time() + tiempo_max
+    inicio = time.perf_counter()
+    puntos = []
+    # Los resultados se consumen en orden, a medida que llegan si mapear es
+    # perezoso; al interrumpirse se cierra el iterador para que descarte las
+    # resoluciones que aún no han empezado
+    resultados = iter(mapear(partial(_sor_resumen, A, b, tol, max_iter, diagnostico, limite),
+                             omegas))
+    try:
+        for punto in resultados:
+            puntos.append(punto)
+            if reportar(len(puntos), punto['iteraciones']):
+                break
+    finally:
+        if hasattr(resultados, 'close'):
+            resultados.close()
+    tiempo_total = time.perf_counter() - inicio
+    if reportar.motivo is None and any(punto['motivo'] == 'timeout' for punto in puntos):
+        reportar.motivo = 'timeout'
+    
+    convergentes = [punto for punto in puntos if punto['convergencia']]
+    mejor = min(convergentes, key=lambda punto: (punto['iteraciones'], punto['error_final'])) \
+        if convergentes else None
+    try:
+        omega_teorico = _omega_optimo(_radio_espectral_jacobi(A))
+    except ValueError:
+        omega_teorico = None
+    
+    return {
+        'puntos': puntos,
+        'omega_min': omega_min,
+        'omega_max': omega_max,
+        'pasos': pasos,
+        'convergencia': mejor is not None,
+        'mejor_omega': mejor['omega'] if mejor else None,
+        'mejor_iteraciones': mejor['iteraciones'] if mejor else None,
+        'omega_teorico': omega_teorico,
+        'tiempo_total': tiempo_total,
+        'diagnostico': diagnostico,
+        'cancelado': reportar.cancelado,
+        'motivo': reportar.motivo
     }
 
 
@@ -140,8 +1415,16 @@ def sor(A: np.ndarray, b: np.ndarray, omega: float = 1.5, x0: np.ndarray = None,
 # RAÍCES DE ECUACIONES
 # ============================================================================
 
+def _derivada_numerica(f: Callable[[float], float], x: float,
+                       h: float = 1e-8) -> Tuple[float, float]:
+    """Devuelve f(x) y la aproximación de f'(x) por diferencia hacia adelante"""
+    f_x = f(x)
+    return f_x, (f(x + h) - f_x) / h
+
+
 def newton_raphson(func_str: str, x0: float, tol: float = 1e-6, 
-                   max_iter: int = 100) -> Dict[str, Any]:
+                   max_iter: int = 100, derivada: str = 'automatica',
+                   tiempo_max: float = None, cancelacion: Any = None) -> Dict[str, Any]:
     """
     Encuentra la raíz de una función usando el método de Newton-Raphson.
     
@@ -150,25 +1433,39 @@ def newton_raphson(func_str: str, x0: float, tol: float = 1e-6,
         x0: Punto inicial
         tol: Tolerancia
         max_iter: Máximo de iteraciones
+        derivada: 'automatica' (exacta, con números duales) o 'numerica'
+                  (diferencia hacia adelante). Si la derivada automática no
+                  puede evaluarse en un punto, se usa la numérica.
+        tiempo_max: Presupuesto de tiempo en segundos (None: sin límite)
+        cancelacion: Token de cancelación con is_set() (p. ej. threading.Event)
     
     Returns:
-        Dict con raíz, iteraciones y errores
+        Dict con raíz, iteraciones y errores. Si no converge, 'motivo'
+        indica por qué se detuvo ('max_iter', 'timeout' o 'cancelado'); al
+        interrumpirse, la raíz es el punto evaluado con menor |f(x)|
     """
-    # Definir la función y su derivada
+    if derivada not in ('automatica', 'numerica'):
+        raise ValueError(f"Tipo de derivada desconocido: {derivada}")
+
+    # Compilar la función una sola vez (sin evaluar texto dentro del bucle)
+    f = compilar_funcion(func_str)
+    control = _Progreso(tiempo_max=tiempo_max, cancelacion=cancelacion)
     x = x0
+    mejor_x, mejor_f = x0, float('inf')
     iteraciones = []
     errores = []
     
-    # Calcular derivada numéricamente
-    h = 1e-8
-    
     for i in range(max_iter):
-        # Evaluar función
-        f_x = eval(func_str.replace('x', f'({x})'))
-        
-        # Derivada numérica
-        f_x_h = eval(func_str.replace('x', f'({x + h})'))
-        df_x = (f_x_h - f_x) / h
+        # Evaluar función y derivada en una sola pasada
+        if derivada == 'automatica':
+            try:
+                f_x, df_x = f.con_derivada(x)
+            except (ArithmeticError, ValueError, TypeError):
+                f_x, df_x = _derivada_numerica(f, x)
+        else:
+            f_x, df_x = _derivada_numerica(f, x)
+        if abs(f_x) < abs(mejor_f):
+            mejor_x, mejor_f = x, f_x
         
         if abs(df_x) < 1e-12:
             return {
@@ -201,15 +1498,19 @@ def newton_raphson(func_str: str, x0: float, tol: float = 1e-6,
                 'error_final': error,
                 'historial': iteraciones,
                 'errores': errores,
-                'f_raiz': eval(func_str.replace('x', f'({x_new})'))
+                'f_raiz': f(x_new)
             }
         
         x = x_new
+        if control(i + 1, error):
+            x = mejor_x
+            break
     
     return {
         'raiz': x,
-        'iteraciones_totales': max_iter,
+        'iteraciones_totales': len(errores),
         'convergencia': False,
+        'motivo': control.motivo or 'max_iter',
         'error_final': errores[-1] if errores else None,
         'historial': iteraciones,
         'errores': errores
@@ -217,7 +1518,8 @@ def newton_raphson(func_str: str, x0: float, tol: float = 1e-6,
 
 
 def biseccion(func_str: str, a: float, b: float, tol: float = 1e-6,
-              max_iter: int = 100) -> Dict[str, Any]:
+              max_iter: int = 100, tiempo_max: float = None,
+              cancelacion: Any = None) -> Dict[str, Any]:
     """
     Encuentra la raíz de una función usando el método de Bisección.
     
@@ -226,13 +1528,19 @@ def biseccion(func_str: str, a: float, b: float, tol: float = 1e-6,
         a, b: Extremos del intervalo [a, b]
         tol: Tolerancia
         max_iter: Máximo de iteraciones
+        tiempo_max: Presupuesto de tiempo en segundos (None: sin límite)
+        cancelacion: Token de cancelación con is_set() (p. ej. threading.Event)
     
     Returns:
-        Dict con raíz, iteraciones y errores
+        Dict con raíz, iteraciones y errores ('motivo' si no converge; la
+        raíz es entonces el punto medio del último intervalo)
     """
+    f = compilar_funcion(func_str)
+    control = _Progreso(tiempo_max=tiempo_max, cancelacion=cancelacion)
+    
     # Evaluar en los extremos
-    f_a = eval(func_str.replace('x', f'({a})'))
-    f_b = eval(func_str.replace('x', f'({b})'))
+    f_a = f(a)
+    f_b = f(b)
     
     if f_a * f_b > 0:
         return {
@@ -247,7 +1555,7 @@ def biseccion(func_str: str, a: float, b: float, tol: float = 1e-6,
     
     for i in range(max_iter):
         c = (a + b) / 2
-        f_c = eval(func_str.replace('x', f'({c})'))
+        f_c = f(c)
         
         error = (b - a) / 2
         
@@ -269,37 +1577,188 @@ def biseccion(func_str: str, a: float, b: float, tol: float = 1e-6,
                 'error_final': error,
                 'historial': iteraciones,
                 'errores': errores,
-                'f_raiz': f_c
+                'f_raiz': f_c,
+                'evaluaciones_funcion': i + 3
             }
         
-        f_a = eval(func_str.replace('x', f'({a})'))
+        # f(a) ya es conocido: se actualiza junto con el extremo
         if f_a * f_c < 0:
             b = c
         else:
-            a = c
+            a, f_a = c, f_c
+        
+        if control(i + 1, error):
+            break
     
     c = (a + b) / 2
     return {
         'raiz': c,
-        'iteraciones_totales': max_iter,
+        'iteraciones_totales': len(errores),
         'convergencia': False,
+        'motivo': control.motivo or 'max_iter',
         'error_final': errores[-1] if errores else None,
         'historial': iteraciones,
-        'errores': errores
+        'errores': errores,
+        'evaluaciones_funcion': len(errores) + 2
+    }
+
+
+def brent(func_str: str, a: float, b: float, tol: float = 1e-6,
+          max_iter: int = 100, tiempo_max: float = None,
+          cancelacion: Any = None) -> Dict[str, Any]:
+    """
+    Encuentra la raíz con el método de Brent (bisección, secante e
+    interpolación cuadrática inversa).
+
+    Mantiene siempre un intervalo con cambio de signo, como la bisección,
+    pero converge superlinealmente cerca de una raíz simple. Cada iteración
+    evalúa la función una sola vez. Se detiene cuando f(b) = 0 o cuando el
+    intervalo mide a lo sumo 2·tol1, con tol1 = 2·eps·|b| + tol/2; en las
+    raíces múltiples la convergencia es solo lineal.
+    
+    Args:
+        func_str: String con la función
+        a, b: Extremos del intervalo [a, b]
+        tol: Tolerancia
+        max_iter: Máximo de iteraciones
+        tiempo_max: Presupuesto de tiempo en segundos (None: sin límite)
+        cancelacion: Token de cancelación con is_set() (p. ej. threading.Event)
+    
+    Returns:
+        Dict con raíz, iteraciones, errores y evaluaciones de la función
+        ('motivo' si no converge; la raíz es entonces la mejor aproximación)
+    """
+    f = compilar_funcion(func_str)
+    control = _Progreso(tiempo_max=tiempo_max, cancelacion=cancelacion)
+    
+    f_a = f(a)
+    f_b = f(b)
+    evaluaciones = 2
+    
+    if f_a * f_b > 0:
+        return {
+            'raiz': None,
+            'convergencia': False,
+            'error': 'La función no cambia de signo en el intervalo dado',
+            'historial': [],
+            'evaluaciones_funcion': evaluaciones
+        }
+    
+    # b es la mejor aproximación y c el contrapunto (f(b) y f(c) con signos
+    # opuestos, |f(b)| <= |f(c)|); a es la aproximación anterior
+    c, f_c = a, f_a
+    d = e = b - a
+    if abs(f_c) < abs(f_b):
+        a, b, c = b, c, b
+        f_a, f_b, f_c = f_b, f_c, f_b
+    eps = np.finfo(float).eps
+    
+    iteraciones = []
+    errores = []
+    convergio = False
+    
+    for i in range(max_iter + 1):
+        # La raíz no puede localizarse mejor que tol1 (error relativo de b)
+        tol1 = 2 * eps * abs(b) + tol / 2
+        m = (c - b) / 2
+        if f_b == 0 or abs(m) <= tol1:
+            convergio = True
+            break
+        if i == max_iter:
+            break
+        
+        paso = 'bisección'
+        if abs(e) > tol1 and abs(f_b) < abs(f_a):
+            if a == c:
+                s = -f_b * (b - a) / (f_b - f_a)
+                tipo = 'secante'
+            else:
+                d_a = (f_a - f_b) / (a - b)
+                d_c = (f_c - f_b) / (c - b)
+                s = -f_b * (f_c * d_c - f_a * d_a) / (d_c * d_a * (f_c - f_a))
+                tipo = 'cuadrática inversa'
+            # El paso interpolado debe quedar dentro del intervalo y ser menor
+            # que la mitad del penúltimo; si no, se biseca
+            if 2 * abs(s) < min(abs(e), 3 * abs(m) - tol1):
+                e, d = d, s
+                paso = tipo
+        if paso == 'bisección':
+            e = d = m
+        
+        # Paso mínimo tol1 hacia el contrapunto: cerca de la raíz así se
+        # comprueba el cambio de signo en vez de bisecar hasta el final
+        a, f_a = b, f_b
+        b += d if abs(d) > tol1 else (tol1 if m > 0 else -tol1)
+        f_b = f(b)
+        evaluaciones += 1
+        nuevo, f_nuevo = b, f_b
+        
+        if (f_b > 0) == (f_c > 0):
+            c, f_c = a, f_a
+            d = e = b - a
+        if abs(f_c) < abs(f_b):
+            a, b, c = b, c, b
+            f_a, f_b, f_c = f_b, f_c, f_b
+        
+        error = abs(c - b)
+        iteraciones.append({
+            'iteracion': i + 1,
+            'a': c,
+            'b': b,
+            's': nuevo,
+            'f(s)': f_nuevo,
+            'paso': paso,
+            'error': error
+        })
+        errores.append(error)
+        
+        if control(i + 1, error):
+            break
+    
+    if not convergio:
+        return {
+            'raiz': b,
+            'iteraciones_totales': len(iteraciones),
+            'convergencia': False,
+            'motivo': control.motivo or 'max_iter',
+            'error_final': errores[-1] if errores else None,
+            'historial': iteraciones,
+            'errores': errores,
+            'evaluaciones_funcion': evaluaciones
+        }
+    
+    return {
+        'raiz': b,
+        'iteraciones_totales': len(iteraciones),
+        'convergencia': True,
+        'error_final': errores[-1] if errores else 0.0,
+        'historial': iteraciones,
+        'errores': errores,
+        'f_raiz': f_b,
+        'evaluaciones_funcion': evaluaciones
     }
 
 
 def secante(func_str: str, x0: float, x1: float, tol: float = 1e-6,
-            max_iter: int = 100) -> Dict[str, Any]:
+            max_iter: int = 100, tiempo_max: float = None,
+            cancelacion: Any = None) -> Dict[str, Any]:
     """
     Encuentra la raíz usando el método de la Secante.
+
+    tiempo_max y cancelacion como en newton_raphson: al interrumpirse, la
+    raíz es el punto evaluado con menor |f(x)|.
     """
+    f = compilar_funcion(func_str)
+    control = _Progreso(tiempo_max=tiempo_max, cancelacion=cancelacion)
+    mejor_x, mejor_f = x1, float('inf')
     iteraciones = []
     errores = []
     
     for i in range(max_iter):
-        f_x0 = eval(func_str.replace('x', f'({x0})'))
-        f_x1 = eval(func_str.replace('x', f'({x1})'))
+        f_x0 = f(x0)
+        f_x1 = f(x1)
+        if abs(f_x1) < abs(mejor_f):
+            mejor_x, mejor_f = x1, f_x1
         
         if abs(f_x1 - f_x0) < 1e-12:
             return {
@@ -330,31 +1789,284 @@ def secante(func_str: str, x0: float, x1: float, tol: float = 1e-6,
                 'error_final': error,
                 'historial': iteraciones,
                 'errores': errores,
-                'f_raiz': eval(func_str.replace('x', f'({x2})'))
+                'f_raiz': f(x2)
             }
         
         x0 = x1
         x1 = x2
+        if control(i + 1, error):
+            x1 = mejor_x
+            break
     
     return {
         'raiz': x1,
-        'iteraciones_totales': max_iter,
+        'iteraciones_totales': len(errores),
         'convergencia': False,
+        'motivo': control.motivo or 'max_iter',
         'error_final': errores[-1] if errores else None,
         'historial': iteraciones,
         'errores': errores
     }
 
 
+# ============================================================================
+# RAÍCES MÚLTIPLES - Búsqueda vectorizada desde muchos puntos iniciales
+# ============================================================================
+
+def _puntos_iniciales(x0s: List[float] = None, intervalo: Tuple[float, float] = None,
+                      muestras: int = 100) -> np.ndarray:
+    """Arreglo de puntos iniciales explícito o muestreado en [a, b]"""
+    if x0s is not None:
+        puntos = np.asarray(x0s, dtype=float).ravel()
+    elif intervalo is not None:
+        a, b = intervalo
+        puntos = np.linspace(a, b, int(muestras))
+    else:
+        raise ValueError("Indique los puntos iniciales o un intervalo")
+    if puntos.size == 0:
+        raise ValueError("Se necesita al menos un punto inicial")
+    return puntos
+
+
+def _agrupar_raices(f, puntos: np.ndarray, raices: np.ndarray,
+                    convergidos: np.ndarray, tol: float) -> List[Dict[str, Any]]:
+    """
+    Agrupa las raíces convergidas que coinciden dentro de la tolerancia y
+    devuelve cada raíz distinta con la cuenca de puntos iniciales que llegó a ella.
+    """
+    if not convergidos.any():
+        return []
+
+    orden = np.argsort(raices[convergidos])
+    valores = raices[convergidos][orden]
+    origenes = puntos[convergidos][orden]
+    separacion = np.maximum(10 * tol, 1e-9 * np.abs(valores[1:]))
+    cortes = np.flatnonzero(np.diff(valores) > separacion) + 1
+
+    resultado = []
+    for grupo_x, grupo_x0 in zip(np.split(valores, cortes), np.split(origenes, cortes)):
+        raiz = float(np.median(grupo_x))
+        cuenca = np.sort(grupo_x0)
+        resultado.append({
+            'raiz': raiz,
+            'f_raiz': float(f(raiz)),
+            'puntos_cuenca': int(cuenca.size),
+            'cuenca': cuenca.tolist()
+        })
+    return resultado
+
+
+def _resultado_multiple(metodo: str, f, puntos: np.ndarray, x: np.ndarray,
+                        convergidos: np.ndarray, iteraciones: np.ndarray,
+                        tol: float, motivo: str = None) -> Dict[str, Any]:
+    raices = _agrupar_raices(f, puntos, x, convergidos, tol)
+    interrupcion = {'motivo': motivo} if motivo else {}
+    return {
+        **interrupcion,
+        'metodo': metodo,
+        'raices': raices,
+        'total_puntos': int(puntos.size),
+        'puntos_convergidos': int(convergidos.sum()),
+        'iteraciones_totales': int(iteraciones.max()),
+        'convergencia': bool(raices),
+        'puntos_iniciales': puntos.tolist(),
+        'raiz_por_punto': [float(v) if ok else None for v, ok in zip(x, convergidos)]
+    }
+
+
+def newton_raphson_multiple(func_str: str, x0s: List[float] = None,
+                            intervalo: Tuple[float, float] = None, muestras: int = 100,
+                            tol: float = 1e-6, max_iter: int = 100,
+                            tiempo_max: float = None, cancelacion: Any = None) -> Dict[str, Any]:
+    """
+    Newton-Raphson desde muchos puntos iniciales a la vez.
+
+    Todos los puntos se iteran como un arreglo de NumPy (derivada exacta con
+    números duales); los que convergen o fallan se enmascaran y dejan de
+    evaluarse.
+    
+    Args:
+        func_str: String con la función
+        x0s: Lista de puntos iniciales, o bien
+        intervalo: (a, b) del que se toman `muestras` puntos equiespaciados
+        tol: Tolerancia
+        max_iter: Máximo de iteraciones
+        tiempo_max, cancelacion: ver newton_raphson; al interrumpirse se
+            devuelven las raíces halladas hasta entonces ('motivo')
+    
+    Returns:
+        Dict con las raíces distintas y la cuenca de puntos iniciales de cada una
+    """
+    f = compilar_funcion(func_str)
+    control = _Progreso(tiempo_max=tiempo_max, cancelacion=cancelacion)
+    puntos = _puntos_iniciales(x0s, intervalo, muestras)
+    x = puntos.copy()
+    activos = np.ones(x.size, dtype=bool)
+    convergidos = np.zeros(x.size, dtype=bool)
+    iteraciones = np.zeros(x.size, dtype=int)
+    
+    with np.errstate(all='ignore'):
+        for k in range(max_iter):
+            idx = np.flatnonzero(activos)
+            if idx.size == 0 or control(k, 0.0):
+                break
+            
+            f_x, df_x = f.con_derivada_vectorizada(x[idx])
+            x_new = x[idx] - f_x / df_x
+            validos = np.isfinite(x_new) & (np.abs(df_x) >= 1e-12)
+            error = np.abs(x_new - x[idx])
+            
+            x[idx] = np.where(validos, x_new, x[idx])
+            iteraciones[idx] += 1
+            listos = validos & (error < tol)
+            convergidos[idx[listos]] = True
+            activos[idx[listos | ~validos]] = False
+    
+    return _resultado_multiple('newton', f, puntos, x, convergidos, iteraciones, tol, control.motivo)
+
+
+def secante_multiple(func_str: str, x0s: List[float] = None,
+                     intervalo: Tuple[float, float] = None, muestras: int = 100,
+                     tol: float = 1e-6, max_iter: int = 100,
+                     x1s: List[float] = None, tiempo_max: float = None,
+                     cancelacion: Any = None) -> Dict[str, Any]:
+    """
+    Método de la Secante desde muchos puntos iniciales a la vez.
+
+    Si no se da x1s, el segundo punto de cada par es x0 + 1e-3·max(1, |x0|).
+    Devuelve lo mismo que newton_raphson_multiple.
+    """
+    f = compilar_funcion(func_str)
+    control = _Progreso(tiempo_max=tiempo_max, cancelacion=cancelacion)
+    puntos = _puntos_iniciales(x0s, intervalo, muestras)
+    if x1s is None:
+        x1 = puntos + 1e-3 * np.maximum(1.0, np.abs(puntos))
+    else:
+        x1 = np.asarray(x1s, dtype=float).ravel()
+        if x1.shape != puntos.shape:
+            raise ValueError("x1s debe tener la misma longitud que los puntos iniciales")
+    x0 = puntos.copy()
+    f0 = f.vectorizada(x0)
+    activos = np.ones(x0.size, dtype=bool)
+    convergidos = np.zeros(x0.size, dtype=bool)
+    iteraciones = np.zeros(x0.size, dtype=int)
+    
+    with np.errstate(all='ignore'):
+        for k in range(max_iter):
+            idx = np.flatnonzero(activos)
+            if idx.size == 0 or control(k, 0.0):
+                break
+            
+            f1 = f.vectorizada(x1[idx])
+            diferencia = f1 - f0[idx]
+            x2 = x1[idx] - f1 * (x1[idx] - x0[idx]) / diferencia
+            validos = np.isfinite(x2) & (np.abs(diferencia) >= 1e-12)
+            error = np.abs(x2 - x1[idx])
+            
+            # Cada evaluación se reutiliza en la siguiente iteración
+            x0[idx] = x1[idx]
+            f0[idx] = f1
+            x1[idx] = np.where(validos, x2, x1[idx])
+            iteraciones[idx] += 1
+            listos = validos & (error < tol)
+            convergidos[idx[listos]] = True
+            activos[idx[listos | ~validos]] = False
+    
+    return _resultado_multiple('secante', f, puntos, x1, convergidos, iteraciones, tol, control.motivo)
+
+
 # ============================================================================
 # INTERPOLACIÓN
 # ============================================================================
 
+def _pesos_baricentricos(x: np.ndarray) -> np.ndarray:
+    """
+    Pesos de la fórmula baricéntrica w_j = 1 / prod_{k != j} (x_j - x_k).
+
+    Las diferencias se escalan por 4 / (max(x) - min(x)) para evitar
+    desbordes con n grande; la fórmula es invariante a ese factor común.
+    """
+    n = len(x)
+    if n == 1:
+        return np.ones(1)
+    escala = 4.0 / (x.max() - x.min())
+    diferencias = (x[:, None] - x[None, :]) * escala
+    np.fill_diagonal(diferencias, 1.0)
+    w = 1.0 / np.prod(diferencias, axis=1)
+    return w / np.abs(w).max()
+
+
+def _evaluar_baricentrica(x: np.ndarray, y: np.ndarray, w: np.ndarray,
+                          t: np.ndarray) -> np.ndarray:
+    """
+    Evalúa el polinomio interpolante en todos los puntos t a la vez con la
+    segunda forma baricéntrica: O(n·m) para m puntos.
+    """
+    t = np.atleast_1d(np.asarray(t, dtype=float))
+    diferencias = t[:, None] - x[None, :]
+    with np.errstate(divide='ignore', over='ignore', invalid='ignore'):
+        C = w / diferencias
+        valores = (C @ y) / C.sum(axis=1)
+    
+    # En los nodos (o tan cerca que w / (t - x_j) desborda) el polinomio vale
+    # exactamente y_j; esas filas se reemplazan
+    filas, columnas = np.nonzero(np.isinf(C))
+    valores[filas] = y[columnas]
+    return valores
+
+
+# Interpolantes ya ajustados (pesos baricéntricos, coeficientes de Newton,
+# splines), reutilizables entre solicitudes del mismo proceso
+MAX_BYTES_CACHE_INTERPOLANTES = 32 * 1024 * 1024
+_cache_interpolantes = CacheLRU(MAX_BYTES_CACHE_INTERPOLANTES)
+
+
+def _ajustar_interpolante(metodo: str, x: np.ndarray,
+                          y: np.ndarray) -> Tuple[Dict[str, Any], int]:
+    """
+    Ajusta el interpolante y devuelve (modelo, bytes). El modelo contiene la
+    función 'evaluar' (vectorizada) y los datos propios de cada método.
+    """
+    if metodo == 'lagrange':
+        w = _pesos_baricentricos(x)
+        modelo = {'evaluar': lambda t: _evaluar_baricentrica(x, y, w, t)}
+        nbytes = x.nbytes + y.nbytes + w.nbytes
+    elif metodo == 'newton':
+        c, _ = _coeficientes_newton(x, y, incluir_tabla=False)
+        modelo = {'evaluar': lambda t: _evaluar_newton(x, c, t), 'coeficientes': c}
+        nbytes = x.nbytes + c.nbytes
+    elif metodo == 'spline':
+        from scipy.interpolate import CubicSpline
+        cs = CubicSpline(x, y, bc_type='natural')
+        modelo = {'evaluar': cs}
+        nbytes = cs.x.nbytes + cs.c.nbytes
+    else:
+        raise ValueError(f"Método de interpolación desconocido: {metodo}")
+    return modelo, nbytes
+
+
+def _interpolante(metodo: str, x_points: List[float],
+                  y_points: List[float]) -> Dict[str, Any]:
+    """Interpolante ajustado, tomado de la caché si ya se ajustó con estos datos"""
+    x = np.asarray(x_points, dtype=float)
+    y = np.asarray(y_points, dtype=float)
+    # Nodos repetidos: los pesos y las diferencias divididas dividirían por cero
+    if np.unique(x).size != x.size:
+        raise ValueError("Los puntos x deben ser distintos entre sí")
+    return _cache_interpolantes.obtener(
+        huella(metodo, x, y), lambda: _ajustar_interpolante(metodo, x, y)
+    )
+
+
 def interpolacion_lagrange(x_points: List[float], y_points: List[float], 
                           x_eval: float = None) -> Dict[str, Any]:
     """
     Realiza interpolación de Lagrange.
     
+    Usa la forma baricéntrica: los pesos se calculan una vez en O(n²) y la
+    curva completa se evalúa de forma vectorizada en O(n·m), lo que además
+    es numéricamente estable (por ejemplo con nodos de Chebyshev).
+    
     Args:
         x_points: Lista de puntos x conocidos
         y_points: Lista de puntos y conocidos
@@ -364,26 +2076,12 @@ def interpolacion_lagrange(x_points: List[float], y_points: List[float],
         Dict con coeficientes, polinomio y evaluación
     """
     n = len(x_points)
-    
-    def L(k, x):
-        """Calcula el k-ésimo polinomio base de Lagrange"""
-        resultado = 1.0
-        for i in range(n):
-            if i != k:
-                resultado *= (x - x_points[i]) / (x_points[k] - x_points[i])
-        return resultado
-    
-    def P(x):
-        """Evalúa el polinomio interpolante en x"""
-        resultado = 0.0
-        for k in range(n):
-            resultado += y_points[k] * L(k, x)
-        return resultado
+    evaluar = _interpolante('lagrange', x_points, y_points)['evaluar']
     
     # Generar puntos para graficar
     x_min, x_max = min(x_points), max(x_points)
     x_plot = np.linspace(x_min, x_max, 100)
-    y_plot = [P(x) for x in x_plot]
+    y_plot = evaluar(x_plot)
     
     resultado = {
         'tipo': 'Lagrange',
@@ -391,87 +2089,120 @@ def interpolacion_lagrange(x_points: List[float], y_points: List[float],
         'puntos_x': x_points,
         'puntos_y': y_points,
         'x_grafica': x_plot.tolist(),
-        'y_grafica': y_plot
+        'y_grafica': y_plot.tolist()
     }
     
     if x_eval is not None:
         resultado['x_evaluado'] = x_eval
-        resultado['y_evaluado'] = P(x_eval)
+        resultado['y_evaluado'] = float(evaluar(x_eval)[0])
+    
+    return resultado
+
+
+def _coeficientes_newton(x: np.ndarray, y: np.ndarray,
+                         incluir_tabla: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Diferencias divididas de Newton, una columna por paso con slicing de NumPy.
+
+    Returns:
+        (coeficientes, tabla). Si incluir_tabla es False no se construye la
+        tabla n x n: los coeficientes se calculan sobre un solo vector y la
+        tabla devuelta es None.
+    """
+    n = len(x)
+    if not incluir_tabla:
+        c = y.copy()
+        for j in range(1, n):
+            c[j:] = (c[j:] - c[j - 1:-1]) / (x[j:] - x[:n - j])
+        return c, None
     
+    tabla = np.zeros((n, n))
+    tabla[:, 0] = y
+    for j in range(1, n):
+        tabla[:n - j, j] = (tabla[1:n - j + 1, j - 1] - tabla[:n - j, j - 1]) / \
+                           (x[j:] - x[:n - j])
+    return tabla[0, :].copy(), tabla
+
+
+def _evaluar_newton(x: np.ndarray, c: np.ndarray, t: np.ndarray) -> np.ndarray:
+    """Evalúa la forma de Newton en todos los puntos t con el esquema de Horner"""
+    t = np.atleast_1d(np.asarray(t, dtype=float))
+    resultado = np.full(t.shape, c[-1])
+    for k in range(len(c) - 2, -1, -1):
+        resultado = c[k] + (t - x[k]) * resultado
     return resultado
 
 
 def interpolacion_newton(x_points: List[float], y_points: List[float],
-                        x_eval: float = None) -> Dict[str, Any]:
+                        x_eval: float = None, incluir_tabla: bool = True) -> Dict[str, Any]:
     """
     Realiza interpolación usando diferencias divididas de Newton.
     
+    Args:
+        x_points: Lista de puntos x conocidos
+        y_points: Lista de puntos y conocidos
+        x_eval: Punto donde evaluar el polinomio (opcional)
+        incluir_tabla: Si es False, 'tabla_diferencias' no se incluye en el
+                       resultado (para n grande domina el tamaño de la respuesta)
+    
     Returns:
         Dict con tabla de diferencias divididas, coeficientes y evaluación
     """
     n = len(x_points)
-    
-    # Tabla de diferencias divididas
-    tabla = np.zeros((n, n))
-    tabla[:, 0] = y_points
-    
-    for j in range(1, n):
-        for i in range(n - j):
-            tabla[i, j] = (tabla[i + 1, j - 1] - tabla[i, j - 1]) / \
-                         (x_points[i + j] - x_points[i])
-    
-    # Coeficientes (primera fila)
-    coeficientes = tabla[0, :].tolist()
-    
-    def P(x):
-        """Evalúa el polinomio de Newton en x"""
-        resultado = coeficientes[0]
-        producto = 1.0
-        for k in range(1, n):
-            producto *= (x - x_points[k - 1])
-            resultado += coeficientes[k] * producto
-        return resultado
+    modelo = _interpolante('newton', x_points, y_points)
+    evaluar = modelo['evaluar']
+    coeficientes = modelo['coeficientes']
+    tabla = None
+    if incluir_tabla:
+        _, tabla = _coeficientes_newton(np.asarray(x_points, dtype=float),
+                                        np.asarray(y_points, dtype=float))
     
     # Generar puntos para graficar
     x_min, x_max = min(x_points), max(x_points)
     x_plot = np.linspace(x_min, x_max, 100)
-    y_plot = [P(x) for x in x_plot]
+    y_plot = evaluar(x_plot)
     
     resultado = {
         'tipo': 'Newton',
         'grado': n - 1,
         'puntos_x': x_points,
         'puntos_y': y_points,
-        'coeficientes': coeficientes,
-        'tabla_diferencias': tabla.tolist(),
+        'coeficientes': coeficientes.tolist(),
         'x_grafica': x_plot.tolist(),
-        'y_grafica': y_plot
+        'y_grafica': y_plot.tolist()
     }
+    if tabla is not None:
+        resultado['tabla_diferencias'] = tabla.tolist()
     
     if x_eval is not None:
         resultado['x_evaluado'] = x_eval
-        resultado['y_evaluado'] = P(x_eval)
+        resultado['y_evaluado'] = float(evaluar(x_eval)[0])
     
     return resultado
 
 
-def interpolacion_spline_cubico(x_points: List[float], y_points: List[float]) -> Dict[str, Any]:
+def interpolacion_spline_cubico(x_points: List[float], y_points: List[float],
+                                x_eval: float = None) -> Dict[str, Any]:
     """
     Realiza interpolación con Splines Cúbicos Naturales.
     """
-    from scipy.interpolate import CubicSpline
-    
-    cs = CubicSpline(x_points, y_points, bc_type='natural')
+    cs = _interpolante('spline', x_points, y_points)['evaluar']
     
     # Generar puntos para graficar
     x_min, x_max = min(x_points), max(x_points)
     x_plot = np.linspace(x_min, x_max, 200)
     y_plot = cs(x_plot)
     
-    return {
+    resultado = {
         'tipo': 'Spline Cúbico Natural',
         'puntos_x': x_points,
         'puntos_y': y_points,
         'x_grafica': x_plot.tolist(),
         'y_grafica': y_plot.tolist()
     }
+    
+    if x_eval is not None:
+        resultado['x_evaluado'] = x_eval
+        resultado['y_evaluado'] = float(cs(x_eval))
+    
+    return resultado
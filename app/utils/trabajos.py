@@ -0,0 +1,223 @@
+"""
+Cola de trabajos en segundo plano para las resoluciones grandes
+
+Los solvers se ejecutan en un ProcessPoolExecutor acotado, fuera del worker
+que atiende la petición. El estado de cada trabajo se guarda en la tabla
+jobs, de modo que cualquier worker puede responder la consulta de estado;
+al terminar, el proceso web que lo envió guarda el Problem y marca el
+trabajo como completado.
+
+Los solvers que aceptan un callback de progreso (CG y SOR) escriben su
+avance en la tabla job_progreso y consultan en cada reporte si el usuario
+pidió cancelar el trabajo.
+
+Los barridos de parámetros (varias resoluciones independientes del mismo
+problema) se reparten en un segundo pool con un proceso por núcleo.
+
+Los solvers que aceptan tiempo_max se detienen al agotar su presupuesto de
+tiempo y devuelven su mejor aproximación con motivo 'timeout'; esos
+resultados parciales se guardan pero no se reutilizan.
+"""
+import os
+import inspect
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from functools import partial
+from sqlalchemy import create_engine, select
+
+from database import db
+from models.job_model import Job, JobProgreso
+from models.problem_model import Problem
+
+MAX_TRABAJADORES = int(os.environ.get("MAX_TRABAJADORES", 2))
+# Trabajos enviados y no terminados que acepta cada proceso web
+MAX_TRABAJOS_EN_COLA = int(os.environ.get("MAX_TRABAJOS_EN_COLA", 4 * MAX_TRABAJADORES))
+# Segundos mínimos entre dos reportes de progreso de un trabajo
+INTERVALO_PROGRESO = float(os.environ.get("INTERVALO_PROGRESO", 0.5))
+# Procesos para los barridos de parámetros (por defecto, uno por núcleo)
+MAX_PROCESOS_BARRIDO = int(os.environ.get("MAX_PROCESOS_BARRIDO", os.cpu_count() or 1))
+# Presupuesto de tiempo (segundos) de las resoluciones que atienden una petición
+TIEMPO_MAX_SINCRONO = float(os.environ.get("TIEMPO_MAX_SINCRONO", 20))
+# Presupuesto de tiempo de los trabajos en segundo plano (0: sin límite)
+TIEMPO_MAX_TRABAJO = float(os.environ.get("TIEMPO_MAX_TRABAJO", 0))
+
+_executor = None
+_executor_barridos = None
+_en_cola = 0
+_lock = threading.Lock()
+
+# Conexiones a la BD abiertas por cada proceso de trabajo
+_engines = {}
+
+
+def _pool() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # spawn: los procesos no heredan las conexiones a la BD del proceso web
+        _executor = ProcessPoolExecutor(max_workers=MAX_TRABAJADORES,
+                                        mp_context=multiprocessing.get_context("spawn"))
+    return _executor
+
+
+def _pool_barridos() -> ProcessPoolExecutor:
+    global _executor_barridos
+    with _lock:
+        if _executor_barridos is None:
+            _executor_barridos = ProcessPoolExecutor(max_workers=MAX_PROCESOS_BARRIDO,
+                                                     mp_context=multiprocessing.get_context("spawn"))
+    return _executor_barridos
+
+
+def _aplicar_lote(funcion, lote) -> list:
+    return [funcion(valor) for valor in lote]
+
+
+def mapear_en_paralelo(funcion, valores):
+    """
+    map() repartido entre los procesos de barrido; conserva el orden.
+
+    Es un generador: entrega cada resultado en cuanto termina su lote, y al
+    cerrarlo (o al salir del bucle que lo recorre) cancela los lotes que aún
+    no han empezado. funcion debe poder serializarse con pickle. Los valores
+    se envían en lotes para no copiar los datos del problema una vez por
+    valor, pero varios lotes por proceso para repartir bien las resoluciones
+    lentas.
+    """
+    valores = list(valores)
+    lote = max(1, len(valores) // (4 * MAX_PROCESOS_BARRIDO))
+    pool = _pool_barridos()
+    futuros = [pool.submit(_aplicar_lote, funcion, valores[i:i + lote])
+               for i in range(0, len(valores), lote)]
+    try:
+        for futuro in futuros:
+            yield from futuro.result()
+    finally:
+        for futuro in futuros:
+            futuro.cancel()
+
+
+def limitar_tiempo(resolver, segundos):
+    """
+    Agrega el presupuesto tiempo_max al resolver (un partial) si el solver lo
+    acepta; con segundos <= 0 o None lo devuelve sin cambios.
+    """
+    if segundos and 'tiempo_max' in inspect.signature(resolver.func).parameters:
+        return partial(resolver, tiempo_max=segundos)
+    return resolver
+
+
+def _engine(url_bd):
+    engine = _engines.get(url_bd)
+    if engine is None:
+        engine = _engines[url_bd] = create_engine(url_bd)
+    return engine
+
+
+def _actualizar_job(url_bd, job_id, **valores):
+    """Actualiza la fila del trabajo desde un proceso de trabajo"""
+    tabla = Job.__table__
+    with _engine(url_bd).begin() as conexion:
+        conexion.execute(tabla.update().where(tabla.c.id == job_id).values(**valores))
+
+
+def _cancelacion_pedida(url_bd, job_id) -> bool:
+    tabla = Job.__table__
+    with _engine(url_bd).connect() as conexion:
+        return bool(conexion.execute(select(tabla.c.cancelar).where(tabla.c.id == job_id)).scalar())
+
+
+def _reportar_progreso(url_bd, job_id, iteracion, error, tiempo) -> bool:
+    """Callback de progreso de los solvers: guarda el punto y devuelve True si hay que cancelar"""
+    with _engine(url_bd).begin() as conexion:
+        conexion.execute(JobProgreso.__table__.insert().values(
+            job_id=job_id, iteracion=iteracion, error=error, tiempo=tiempo
+        ))
+    return _cancelacion_pedida(url_bd, job_id)
+
+
+def _ejecutar(url_bd, job_id, resolver):
+    """Se ejecuta en el proceso de trabajo; devuelve None si se canceló antes de empezar"""
+    if _cancelacion_pedida(url_bd, job_id):
+        return None
+    _actualizar_job(url_bd, job_id, estado='ejecutando', started_at=datetime.utcnow())
+    if 'progreso' in inspect.signature(resolver.func).parameters:
+        resolver = partial(resolver, progreso=partial(_reportar_progreso, url_bd, job_id),
+                           intervalo_progreso=INTERVALO_PROGRESO)
+    return limitar_tiempo(resolver, TIEMPO_MAX_TRABAJO)()
+
+
+def _finalizar(app, job_id, input_data, futuro):
+    """Callback en el proceso web: guarda el Problem y cierra el trabajo"""
+    global _en_cola
+    try:
+        with app.app_context():
+            job = Job.get_by_id(job_id)
+            try:
+                resultado = futuro.result()
+                if resultado is None:
+                    job.estado = 'cancelado'
+                    job.finished_at = datetime.utcnow()
+                    db.session.commit()
+                    return
+                problem = Problem(
+                    user_id=job.user_id,
+                    method_type=job.method_type,
+                    input_data=input_data,
+                    result_data=resultado,
+                    title=job.title
+                )
+                # Los resultados parciales se guardan sin huella (Problem.es_parcial)
+                problem.save()
+                job.problem_id = problem.id
+                # Los trabajos cancelados durante la iteración guardan el mejor iterado
+                job.estado = 'cancelado' if resultado.get('cancelado') else 'completado'
+            except Exception as e:
+                db.session.rollback()
+                job.estado = 'error'
+                job.mensaje = str(e)
+            job.finished_at = datetime.utcnow()
+            # La curva solo se muestra mientras el trabajo corre; el resultado
+            # guardado ya trae el historial completo
+            JobProgreso.eliminar_de(job_id)
+            db.session.commit()
+    finally:
+        with _lock:
+            _en_cola -= 1
+
+
+def enviar(app, user_id, method_type, input_data, title, resolver) -> Job:
+    """
+    Crea el trabajo y lo envía al pool.
+
+    resolver debe poder serializarse con pickle (por ejemplo, un
+    functools.partial sobre un solver de utils.numerical_methods).
+    Lanza RuntimeError si la cola está llena.
+    """
+    global _en_cola
+    with _lock:
+        if _en_cola >= MAX_TRABAJOS_EN_COLA:
+            raise RuntimeError("Hay demasiados trabajos en cola, intenta de nuevo en unos minutos")
+        _en_cola += 1
+
+    try:
+        job = Job(user_id=user_id, method_type=method_type, title=title)
+        job.save()
+        job_id = job.id
+        url_bd = db.engine.url.render_as_string(hide_password=False)
+        futuro = _pool().submit(_ejecutar, url_bd, job_id, resolver)
+    except Exception:
+        with _lock:
+            _en_cola -= 1
+        raise
+
+    futuro.add_done_callback(lambda f: _finalizar(app, job_id, input_data, f))
+    return job
+
+
+def cancelar(job):
+    """Pide la cancelación; el proceso de trabajo la atiende en su próximo reporte"""
+    if not job.terminado:
+        job.cancelar = True
+        db.session.commit()
@@ -1,6 +1,5 @@
 from flask import render_template
 from flask_login import current_user
-import json
 
 
 def metodos_index():
@@ -12,20 +11,22 @@ def metodos_index():
     )
 
 
-def historial(problems):
-    """Historial de problemas resueltos"""
+def historial(problems, siguiente=None, primera_pagina=True):
+    """Historial de problemas resueltos (una página)"""
     return render_template(
         "historial.html",
         title="Historial de Problemas",
         problems=problems,
+        siguiente=siguiente,
+        primera_pagina=primera_pagina,
         current_user=current_user
     )
 
 
 def ver_problema(problem):
     """Ver detalles de un problema específico"""
-    input_data = json.loads(problem.input_data)
-    result_data = json.loads(problem.result_data)
+    input_data = problem.get_input_data()
+    result_data = problem.get_result_data()
     
     return render_template(
         "ver_problema.html",
@@ -37,6 +38,17 @@ def ver_problema(problem):
     )
 
 
+def ver_trabajo(job, intervalo_sondeo):
+    """Estado de un trabajo en segundo plano"""
+    return render_template(
+        "trabajo.html",
+        title=f"Trabajo #{job.id}",
+        job=job,
+        intervalo_sondeo=intervalo_sondeo,
+        current_user=current_user
+    )
+
+
 # ============================================================================
 # GRADIENTE CONJUGADO
 # ============================================================================
@@ -62,6 +74,19 @@ def resultado_cg(resultado, matriz, vector):
     )
 
 
+def resultado_sistema_multiple(resultado, metodo, matriz, vectores):
+    """Resultados de CG o SOR con varios lados derechos"""
+    return render_template(
+        "resultado_sistema_multiple.html",
+        title=f"Resultado - {metodo} (varios lados derechos)",
+        resultado=resultado,
+        metodo=metodo,
+        matriz=matriz,
+        vectores=vectores,
+        current_user=current_user
+    )
+
+
 # ============================================================================
 # SOR
 # ============================================================================
@@ -87,6 +112,18 @@ def resultado_sor(resultado, matriz, vector):
     )
 
 
+def resultado_barrido_omega(resultado, matriz, vector):
+    """Resultados del barrido de ω de SOR"""
+    return render_template(
+        "resultado_barrido_omega.html",
+        title="Resultado - Barrido de ω",
+        resultado=resultado,
+        matriz=matriz,
+        vector=vector,
+        current_user=current_user
+    )
+
+
 # ============================================================================
 # RAÍCES DE ECUACIONES
 # ============================================================================
@@ -112,6 +149,18 @@ def resultado_raices(resultado, funcion, metodo):
     )
 
 
+def resultado_raices_multiple(resultado, funcion, metodo):
+    """Resultados de la búsqueda de raíces desde múltiples puntos iniciales"""
+    return render_template(
+        "resultado_raices_multiple.html",
+        title=f"Resultado - {metodo.replace('_', ' ').upper()}",
+        resultado=resultado,
+        funcion=funcion,
+        metodo=metodo,
+        current_user=current_user
+    )
+
+
 # ============================================================================
 # INTERPOLACIÓN
 # ============================================================================